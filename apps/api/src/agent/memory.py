@@ -3,7 +3,7 @@
 Responsibilities:
 - Index the workflow dataset (Issue->PR) and repo chunks into embeddings
 - Retrieve top-k similar examples for few-shot prompting
-- Store run artifacts and conversation context
+- Cache successful plans/checklists keyed by feature-request embedding
 
 Storage:
 - Postgres + pgvector
@@ -11,10 +11,288 @@ Storage:
 
 from __future__ import annotations
 
+import logging
 from typing import List, Dict, Any
 
+import hashlib
+import json
 
-def retrieve_similar_workflows(query: str, k: int = 3) -> List[Dict[str, Any]]:
-    """Retrieve top-k workflows (placeholder)."""
-    # TODO: Use pgvector similarity search
-    return []
+import httpx
+import redis.asyncio as aioredis
+from sqlalchemy import text
+from sqlmodel import select
+
+from src.config import get_settings
+from src.database.models import PlanCacheEntry, WorkflowExample
+from src.database.session import get_session
+from src.schemas import ToolResult
+from src.tools.git_ops import git_rev_parse
+from src.tools.repo import repo_map
+
+
+logger = logging.getLogger(__name__)
+
+# Cosine distance below which a cached plan is considered a match
+# (distance = 1 - cosine similarity, so 0.10 ≈ similarity 0.90)
+PLAN_CACHE_DISTANCE_THRESHOLD = 0.10
+
+
+# Provider cap on inputs per embeddings request
+EMBED_BATCH_SIZE = 96
+
+# TTL for cached text embeddings (7 days; keyed by content hash so stale
+# entries can only ever be wasted space, never wrong)
+EMBED_CACHE_TTL_SECONDS = 7 * 24 * 60 * 60
+
+_embed_redis: aioredis.Redis | None = None
+
+
+def _get_embed_redis() -> aioredis.Redis:
+    global _embed_redis
+    if _embed_redis is None:
+        _embed_redis = aioredis.from_url(
+            str(get_settings().redis_url), decode_responses=True
+        )
+    return _embed_redis
+
+
+async def embed_text(text: str) -> list[float]:
+    """Embed a single text via the configured embeddings endpoint."""
+    return (await embed_batch([text]))[0]
+
+
+async def embed_batch(texts: List[str]) -> list[list[float]]:
+    """Embed many texts in as few HTTP round-trips as possible.
+
+    Cached embeddings (keyed by content hash in Redis) are reused; the
+    remaining texts are sent in batches of EMBED_BATCH_SIZE per request
+    rather than one request per text.
+    """
+    settings = get_settings()
+    results: list[list[float] | None] = [None] * len(texts)
+    keys = [
+        f"emb:{settings.embedding_model}:{hashlib.sha256(t.encode()).hexdigest()}"
+        for t in texts
+    ]
+
+    # Reuse cached embeddings where possible
+    try:
+        redis = _get_embed_redis()
+        cached = await redis.mget(keys)
+        for i, value in enumerate(cached):
+            if value is not None:
+                results[i] = json.loads(value)
+    except Exception as e:
+        logger.warning(f"Embedding cache read failed: {e}")
+
+    missing = [i for i, r in enumerate(results) if r is None]
+    if missing:
+        async with httpx.AsyncClient(
+            base_url=settings.embedding_base_url,
+            headers={"Authorization": f"Bearer {settings.embedding_api_key}"},
+            timeout=30.0,
+        ) as client:
+            for batch_start in range(0, len(missing), EMBED_BATCH_SIZE):
+                batch = missing[batch_start:batch_start + EMBED_BATCH_SIZE]
+                response = await client.post(
+                    "/embeddings",
+                    json={
+                        "model": settings.embedding_model,
+                        "input": [texts[i] for i in batch],
+                    },
+                )
+                response.raise_for_status()
+                for i, item in zip(batch, response.json()["data"]):
+                    results[i] = item["embedding"]
+
+        try:
+            redis = _get_embed_redis()
+            async with redis.pipeline(transaction=False) as pipe:
+                for i in missing:
+                    pipe.setex(keys[i], EMBED_CACHE_TTL_SECONDS, json.dumps(results[i]))
+                await pipe.execute()
+        except Exception as e:
+            logger.warning(f"Embedding cache write failed: {e}")
+
+    return results
+
+
+# TTL for cached repo maps (7 days; keyed by HEAD sha, so git's content
+# addressing guarantees stale entries are dead weight, never wrong)
+REPO_MAP_CACHE_TTL_SECONDS = 7 * 24 * 60 * 60
+
+
+async def cached_repo_map(repo_path: str, max_depth: int = 3) -> ToolResult:
+    """repo_map memoized in Redis by the repo's current HEAD sha.
+
+    (sha, max_depth) fully determines the mapped tree, so back-to-back runs
+    on an unchanged branch skip the directory walk and AST summarization
+    entirely. Any failure (no HEAD, Redis down) degrades to an uncached call.
+    """
+    sha_result = await git_rev_parse(repo_path)
+    if not sha_result.ok:
+        return await repo_map(repo_path, max_depth=max_depth)
+    sha = sha_result.data["sha"]
+
+    key = f"repomap:{repo_path}:{sha}:{max_depth}"
+    try:
+        cached = await _get_embed_redis().get(key)
+        if cached is not None:
+            logger.info(f"repo_map cache hit for {repo_path}@{sha[:8]}")
+            # Trusted rehydration: this payload is our own model_dump_json
+            return ToolResult.from_trusted(json.loads(cached))
+    except Exception as e:
+        logger.warning(f"repo_map cache read failed: {e}")
+
+    result = await repo_map(repo_path, max_depth=max_depth)
+    if result.ok:
+        try:
+            await _get_embed_redis().setex(
+                key, REPO_MAP_CACHE_TTL_SECONDS, result.model_dump_json()
+            )
+        except Exception as e:
+            logger.warning(f"repo_map cache write failed: {e}")
+    return result
+
+
+def cosine_similarity(a: list[float], b: list[float]) -> float:
+    """Cosine similarity between two embeddings."""
+    dot = sum(x * y for x, y in zip(a, b))
+    norm_a = sum(x * x for x in a) ** 0.5
+    norm_b = sum(y * y for y in b) ** 0.5
+    if norm_a == 0 or norm_b == 0:
+        return 0.0
+    return dot / (norm_a * norm_b)
+
+
+async def lookup_cached_plan(goal_text: str) -> PlanCacheEntry | None:
+    """Find a previously successful plan for a semantically similar goal.
+
+    Returns the nearest cache entry if its cosine distance is within
+    PLAN_CACHE_DISTANCE_THRESHOLD, otherwise None. Failures (no embedding
+    endpoint, DB down) degrade to a cache miss.
+    """
+    try:
+        embedding = await embed_text(goal_text)
+        async with get_session() as db:
+            distance = PlanCacheEntry.goal_embedding.cosine_distance(embedding)
+            result = await db.execute(
+                select(PlanCacheEntry, distance.label("distance"))
+                .where(PlanCacheEntry.success)
+                .order_by(distance)
+                .limit(1)
+            )
+            row = result.first()
+            if row and row[1] < PLAN_CACHE_DISTANCE_THRESHOLD:
+                logger.info(
+                    f"Plan cache hit (distance={row[1]:.3f}) for goal: {goal_text[:80]}"
+                )
+                return row[0]
+    except Exception as e:
+        logger.warning(f"Plan cache lookup failed, falling back to full generation: {e}")
+    return None
+
+
+async def store_cached_plan(
+    goal_text: str,
+    plan_json: str,
+    checklist_json: str | None = None,
+    success: bool = True,
+) -> None:
+    """Persist a plan/checklist pair for reuse by future similar requests."""
+    try:
+        embedding = await embed_text(goal_text)
+        async with get_session() as db:
+            db.add(
+                PlanCacheEntry(
+                    goal_text=goal_text,
+                    goal_embedding=embedding,
+                    plan_json=plan_json,
+                    checklist_json=checklist_json,
+                    success=success,
+                )
+            )
+            await db.commit()
+    except Exception as e:
+        logger.warning(f"Failed to store plan in cache: {e}")
+
+
+# Below this cosine similarity a retrieved example is noise, not signal
+WORKFLOW_SIMILARITY_FLOOR = 0.5
+
+# IVF probes per query; roughly sqrt(lists) for the 100-list index
+IVFFLAT_PROBES = 10
+
+# Coarse candidate pool re-ranked by exact (halfvec) cosine distance
+COARSE_CANDIDATES = 200
+
+
+def binarize_embedding(embedding: list[float]) -> str:
+    """Sign-binarize an embedding into a pgvector bit string (32x smaller)."""
+    return "".join("1" if v > 0 else "0" for v in embedding)
+
+
+async def index_workflow_example(title: str, payload: Dict[str, Any]) -> None:
+    """Embed and store a workflow example for later retrieval."""
+    embedding = await embed_text(f"{title}\n{json.dumps(payload)[:2000]}")
+    async with get_session() as db:
+        db.add(
+            WorkflowExample(
+                title=title,
+                payload_json=json.dumps(payload),
+                embedding=embedding,
+                embedding_bits=binarize_embedding(embedding),
+            )
+        )
+        await db.commit()
+
+
+async def retrieve_similar_workflows(query: str, k: int = 3) -> List[Dict[str, Any]]:
+    """Retrieve top-k similar workflow examples via two-stage ANN search.
+
+    Stage 1 runs the IVF index over sign-binarized embeddings (Hamming
+    distance), scanning 32x fewer bytes than fp32 vectors; stage 2 re-ranks
+    the coarse candidates by exact fp16 cosine distance. Results below
+    WORKFLOW_SIMILARITY_FLOOR are dropped so weak matches never pollute
+    few-shot prompts.
+    """
+    try:
+        embedding = await embed_text(query)
+        query_bits = binarize_embedding(embedding)
+        async with get_session() as db:
+            await db.execute(text(f"SET LOCAL ivfflat.probes = {IVFFLAT_PROBES}"))
+
+            # Stage 1: coarse Hamming-distance candidates from the bit index
+            hamming = WorkflowExample.embedding_bits.hamming_distance(query_bits)
+            coarse = (
+                select(WorkflowExample.id)
+                .order_by(hamming)
+                .limit(COARSE_CANDIDATES)
+                .subquery()
+            )
+
+            # Stage 2: exact cosine re-rank over the candidate pool
+            distance = WorkflowExample.embedding.cosine_distance(embedding)
+            result = await db.execute(
+                select(WorkflowExample, distance.label("distance"))
+                .where(WorkflowExample.id.in_(select(coarse.c.id)))
+                .order_by(distance)
+                .limit(k)
+            )
+
+            workflows = []
+            for example, dist in result.all():
+                similarity = 1.0 - dist
+                if similarity < WORKFLOW_SIMILARITY_FLOOR:
+                    continue
+                workflows.append(
+                    {
+                        "title": example.title,
+                        "payload": json.loads(example.payload_json),
+                        "similarity": similarity,
+                    }
+                )
+            return workflows
+    except Exception as e:
+        logger.warning(f"Workflow retrieval failed: {e}")
+        return []
@@ -6,6 +6,9 @@ Each step has specialized prompts with clear structure and examples.
 
 from __future__ import annotations
 
+import string
+from typing import Callable
+
 # =============================================================================
 # System Prompts
 # =============================================================================
@@ -61,8 +64,40 @@ Respond with a JSON object following this schema:
 ```"""
 
 
+ADAPT_PLAN_PROMPT = """A proven implementation plan for a very similar feature request is shown below.
+Adapt it for the new request instead of creating a plan from scratch.
+
+## New Feature Request
+{feature_request}
+
+## Repository Context
+{repo_context}
+
+## Proven Plan (for a similar request)
+```json
+{cached_plan}
+```
+
+## Instructions
+1. Keep the structure and approach of the proven plan where it still applies
+2. Update titles, file paths, and steps that differ for the new request
+3. Drop anything that does not apply; add only what is missing
+
+Respond with a JSON object following this schema:
+```json
+{{
+  "title": "string",
+  "problem_statement": "string",
+  "proposed_approach": "string",
+  "affected_files": ["string"],
+  "estimated_complexity": "low|medium|high",
+  "risks": ["string"]
+}}
+```"""
+
+
 # =============================================================================
-# Checklist Node Prompts  
+# Checklist Node Prompts
 # =============================================================================
 
 CHECKLIST_PROMPT = """Based on this plan, create an ordered checklist of implementation steps.
@@ -100,16 +135,10 @@ Respond with a JSON object following this schema:
 # Execute Node Prompts
 # =============================================================================
 
-EXECUTE_PROMPT = """Execute this checklist item by making the required code changes.
-
-## Checklist Item
-{checklist_item}
-
-## Current File Content
-{file_content}
-
-## Repository Context
-{repo_context}
+# Static instructions and the per-run-stable repo context come first; the
+# per-item sections sit at the very end so every item in a run shares the
+# longest possible cached prompt prefix.
+EXECUTE_PROMPT = """Execute the checklist item given at the end of this prompt by making the required code changes.
 
 ## Instructions
 1. Analyze the checklist item carefully
@@ -126,19 +155,19 @@ Respond with a JSON object containing the new file content:
 }}
 ```
 
-IMPORTANT: Return the COMPLETE file content, not just the changes."""
+IMPORTANT: Return the COMPLETE file content, not just the changes.
 
+## Repository Context
+{repo_context}
 
-EXECUTE_REPAIR_PROMPT = """The previous code change failed validation. Fix the issues.
-
-## Original Checklist Item
+## Checklist Item
 {checklist_item}
 
-## Your Previous Attempt
-{previous_attempt}
+## Current File Content
+{file_content}"""
 
-## Validation Errors
-{validation_errors}
+
+EXECUTE_REPAIR_PROMPT = """A previous code change failed validation. Fix the issues in the attempt given at the end of this prompt.
 
 ## Instructions
 1. Analyze what went wrong
@@ -152,7 +181,32 @@ Respond with the corrected file content:
   "new_content": "corrected complete file content",
   "explanation": "What was fixed and why"
 }}
-```"""
+```
+
+## Original Checklist Item
+{checklist_item}
+
+## Your Previous Attempt
+{previous_attempt}
+
+## Validation Errors
+{validation_errors}"""
+
+
+DIFF_DIGEST_PROMPT = """Condense this unified diff into a short technical digest.
+
+## Diff
+```diff
+{diff}
+```
+
+## Instructions
+1. List each changed file with a one-line description of what changed
+2. Call out new/removed functions, classes, and config keys by name
+3. Ignore whitespace, import reordering, and mechanical renames
+4. Keep the digest under {max_tokens} tokens
+
+Respond with plain text (no JSON)."""
 
 
 # =============================================================================
@@ -198,17 +252,62 @@ Respond with a JSON object:
 # Helper Functions
 # =============================================================================
 
+def _compile_template(template: str) -> Callable[..., str]:
+    """Pre-parse a format-string template into a fast render closure.
+
+    ``str.format`` re-parses the ``{field}`` grammar on every call; parsing
+    once at import and joining literal/field pieces skips that overhead on
+    the per-item execute/repair hot path.
+    """
+    pieces = [
+        (literal, field)
+        for literal, field, _spec, _conv in string.Formatter().parse(template)
+    ]
+
+    def render(**kwargs: object) -> str:
+        parts = []
+        for literal, field in pieces:
+            parts.append(literal)
+            if field is not None:
+                parts.append(str(kwargs[field]))
+        return "".join(parts)
+
+    return render
+
+
+_render_plan = _compile_template(PLAN_PROMPT)
+_render_adapt_plan = _compile_template(ADAPT_PLAN_PROMPT)
+_render_checklist = _compile_template(CHECKLIST_PROMPT)
+_render_execute = _compile_template(EXECUTE_PROMPT)
+_render_repair = _compile_template(EXECUTE_REPAIR_PROMPT)
+_render_diff_digest = _compile_template(DIFF_DIGEST_PROMPT)
+_render_summary = _compile_template(SUMMARY_PROMPT)
+
+
 def format_plan_prompt(feature_request: str, repo_context: str) -> str:
     """Format the plan prompt with context."""
-    return PLAN_PROMPT.format(
+    return _render_plan(
         feature_request=feature_request,
         repo_context=repo_context,
     )
 
 
+def format_adapt_plan_prompt(
+    feature_request: str,
+    repo_context: str,
+    cached_plan: str,
+) -> str:
+    """Format the adapt-plan prompt with a cached plan from a similar request."""
+    return _render_adapt_plan(
+        feature_request=feature_request,
+        repo_context=repo_context,
+        cached_plan=cached_plan,
+    )
+
+
 def format_checklist_prompt(plan: str) -> str:
     """Format the checklist prompt with plan."""
-    return CHECKLIST_PROMPT.format(plan=plan)
+    return _render_checklist(plan=plan)
 
 
 def format_execute_prompt(
@@ -217,7 +316,7 @@ def format_execute_prompt(
     repo_context: str,
 ) -> str:
     """Format the execute prompt with context."""
-    return EXECUTE_PROMPT.format(
+    return _render_execute(
         checklist_item=checklist_item,
         file_content=file_content,
         repo_context=repo_context,
@@ -230,20 +329,25 @@ def format_repair_prompt(
     validation_errors: str,
 ) -> str:
     """Format the repair prompt for failed validations."""
-    return EXECUTE_REPAIR_PROMPT.format(
+    return _render_repair(
         checklist_item=checklist_item,
         previous_attempt=previous_attempt,
         validation_errors=validation_errors,
     )
 
 
+def format_diff_digest_prompt(diff: str, max_tokens: int) -> str:
+    """Format the diff digest prompt for cheap-model compression."""
+    return _render_diff_digest(diff=diff, max_tokens=max_tokens)
+
+
 def format_summary_prompt(
     feature_request: str,
     changes: str,
     test_results: str,
 ) -> str:
     """Format the summary prompt with results."""
-    return SUMMARY_PROMPT.format(
+    return _render_summary(
         feature_request=feature_request,
         changes=changes,
         test_results=test_results,
@@ -1,7 +1,7 @@
 """LangGraph workflow definition for the 4-step agent.
 
 Graph structure:
-START → plan_node → checklist_node → execute_node → summary_node → END
+START → plan_node → checklist_node → execute_dispatch ⇉ execute_one (fan-out)
                                          ↓
                                   validate → retry/repair (loop)
                                          ↓
@@ -10,19 +10,27 @@ START → plan_node → checklist_node → execute_node → summary_node → END
 
 from __future__ import annotations
 
+import asyncio
 import json
 import logging
-from datetime import datetime
-from typing import Any, Literal
+import operator
+from datetime import datetime, timezone
+from typing import Annotated, Any, Literal, TypedDict
 from uuid import uuid4
 
+import aiosqlite
+from langgraph.checkpoint.sqlite.aio import AsyncSqliteSaver
 from langgraph.graph import StateGraph, END
+from langgraph.types import Send
+
+from pydantic import BaseModel, ValidationError
 
 from src.schemas import (
     Plan,
     Checklist,
     ChecklistItem,
     ExecutionPatch,
+    ExecutionResult,
     RunSummary,
     ValidationResult,
     FeatureRequest,
@@ -30,14 +38,24 @@ from src.schemas import (
     StepName,
     RunStatus,
 )
+from src.llm.base import register_static_message
 from src.llm.router import get_router
-from src.tools.repo import repo_map, read_file, write_file
+from src.tools.repo import read_file, write_file
 from src.tools.git_ops import git_create_branch, git_status, git_diff, git_commit
 from src.tools.sandbox import run_tests, run_linter
+from src.agent.memory import (
+    cached_repo_map,
+    cosine_similarity,
+    embed_batch,
+    lookup_cached_plan,
+    store_cached_plan,
+)
 from src.agent.prompts import (
     SYSTEM_PROMPT,
     format_plan_prompt,
+    format_adapt_plan_prompt,
     format_checklist_prompt,
+    format_diff_digest_prompt,
     format_execute_prompt,
     format_repair_prompt,
     format_summary_prompt,
@@ -49,14 +67,52 @@ logger = logging.getLogger(__name__)
 # Maximum retries for execution step
 MAX_RETRIES = 2
 
+# SQLite database holding workflow checkpoints (one thread per run_id)
+CHECKPOINT_DB = "devflow_runs.db"
+
+
+def _schema_response_format(model_cls: type[BaseModel]) -> dict[str, Any]:
+    """Build a strict json_schema response_format from a Pydantic model.
+
+    Constrained decoding rules out schema-invalid output server-side, so
+    parse-failure retry round-trips disappear and responses carry no extra
+    prose around the JSON.
+    """
+    return {
+        "type": "json_schema",
+        "json_schema": {
+            "name": model_cls.__name__,
+            "schema": model_cls.model_json_schema(),
+            "strict": True,
+        },
+    }
+
+
+# Shared system message: one allocation per process, pre-serialized in the
+# adapter layer, and byte-identical on every call (which provider prefix
+# caches require)
+SYSTEM_MSG = register_static_message(
+    LLMMessage(role="system", content=SYSTEM_PROMPT, cache_control={"type": "ephemeral"})
+)
+
+# Built once at import; schema generation is not free
+PLAN_RESPONSE_FORMAT = _schema_response_format(Plan)
+CHECKLIST_RESPONSE_FORMAT = _schema_response_format(Checklist)
+EXECUTE_RESPONSE_FORMAT = _schema_response_format(ExecutionResult)
+SUMMARY_RESPONSE_FORMAT = _schema_response_format(RunSummary)
+
 
 # =============================================================================
 # State Definition
 # =============================================================================
 
-class AgentState(dict):
+class AgentState(TypedDict, total=False):
     """State for the agent workflow.
-    
+
+    List fields written by concurrent execute branches carry an
+    ``operator.add`` reducer so fan-out updates merge instead of clobbering
+    each other.
+
     Attributes:
         run_id: Unique identifier for this run
         feature_request: The original feature request
@@ -64,16 +120,42 @@ class AgentState(dict):
         repo_context: Summarized repository context
         plan: Generated implementation plan
         checklist: Generated implementation checklist
-        current_item_index: Current checklist item being executed
-        patches: List of file patches made
+        patches: List of file patches made (merged across branches)
+        completed_ids: IDs of checklist items already executed
         validation_results: Results from validation steps
         summary: Final run summary
         current_step: Current workflow step
-        retry_count: Number of retries for current item
-        errors: List of errors encountered
+        retry_count: Number of validation retries so far
+        errors: List of errors encountered (merged across branches)
         status: Current run status
     """
-    pass
+
+    run_id: str
+    feature_request: FeatureRequest
+    repo_path: str
+    repo_context: str
+    plan: Plan | None
+    checklist: Checklist | None
+    patches: Annotated[list[ExecutionPatch], operator.add]
+    completed_ids: Annotated[list[str], operator.add]
+    validation_results: Annotated[list[ValidationResult], operator.add]
+    summary: RunSummary | None
+    current_step: str
+    retry_count: int
+    errors: Annotated[list[str], operator.add]
+    status: str
+    started_at: str
+    ended_at: str
+
+
+class ExecuteItemState(TypedDict):
+    """Per-item substate sent to ``execute_one`` branches."""
+
+    run_id: str
+    repo_path: str
+    repo_context: str
+    item: ChecklistItem
+    file_content: str
 
 
 def initial_state(feature_request: FeatureRequest, run_id: str | None = None) -> AgentState:
@@ -85,15 +167,15 @@ def initial_state(feature_request: FeatureRequest, run_id: str | None = None) ->
         repo_context="",
         plan=None,
         checklist=None,
-        current_item_index=0,
         patches=[],
+        completed_ids=[],
         validation_results=[],
         summary=None,
-        current_step=StepName.PLAN.value,
+        current_step=StepName.PLAN,
         retry_count=0,
         errors=[],
         status=RunStatus.PLANNING.value,
-        started_at=datetime.utcnow().isoformat(),
+        started_at=datetime.now(timezone.utc).isoformat(),
     )
 
 
@@ -101,336 +183,590 @@ def initial_state(feature_request: FeatureRequest, run_id: str | None = None) ->
 # Node Functions
 # =============================================================================
 
-async def plan_node(state: AgentState) -> AgentState:
+async def plan_node(state: AgentState) -> dict[str, Any]:
     """Generate implementation plan from feature request.
-    
+
     Input: feature_request, repo_path
     Output: plan, repo_context
     """
     logger.info(f"[{state['run_id']}] Starting plan_node")
-    
-    state["current_step"] = StepName.PLAN.value
-    state["status"] = RunStatus.PLANNING.value
-    
-    # Get repository context
-    repo_result = await repo_map(state["repo_path"], max_depth=3)
+
+    updates: dict[str, Any] = {
+        "current_step": StepName.PLAN.value,
+        "status": RunStatus.PLANNING.value,
+    }
+
+    # Get repository context (memoized by HEAD sha across runs)
+    repo_result = await cached_repo_map(state["repo_path"], max_depth=3)
     if not repo_result.ok:
-        state["errors"].append(f"Failed to map repo: {repo_result.error_message}")
-        return state
-    
-    # Build repo context string
+        updates["errors"] = [f"Failed to map repo: {repo_result.error_message}"]
+        return updates
+
+    # Build per-file summary lines
     key_files = repo_result.data.get("key_files", [])
     ast_summaries = repo_result.data.get("ast_summaries", {})
-    
-    context_lines = ["## Key Files"]
-    for f in key_files[:20]:
+
+    file_lines = []
+    for f in key_files:
         summary = ast_summaries.get(f["path"], [])
         if summary:
-            context_lines.append(f"- `{f['path']}`: {', '.join(summary[:5])}")
+            file_lines.append(f"- `{f['path']}`: {', '.join(summary[:5])}")
         else:
-            context_lines.append(f"- `{f['path']}`")
-    
-    state["repo_context"] = "\n".join(context_lines)
-    
+            file_lines.append(f"- `{f['path']}`")
+
+    # Rank files by embedding relevance to the request (one batched call;
+    # per-file embeddings are content-hash cached across runs) so the prompt
+    # carries the 20 most relevant files instead of the first 20 listed.
+    if len(file_lines) > 20:
+        try:
+            vectors = await embed_batch(
+                [state["feature_request"].description] + file_lines
+            )
+            request_vec = vectors[0]
+            ranked = sorted(
+                zip(file_lines, vectors[1:]),
+                key=lambda pair: cosine_similarity(request_vec, pair[1]),
+                reverse=True,
+            )
+            file_lines = [line for line, _ in ranked[:20]]
+        except Exception as e:
+            logger.warning(f"File relevance ranking failed, using first 20: {e}")
+            file_lines = file_lines[:20]
+
+    repo_context = "\n".join(["## Key Files"] + file_lines)
+    updates["repo_context"] = repo_context
+
+    # Check the plan cache for a semantically similar, previously successful
+    # request: adapting a proven plan is far cheaper than a full decomposition.
+    cached = await lookup_cached_plan(state["feature_request"].description)
+
+    if cached is not None:
+        prompt = format_adapt_plan_prompt(
+            feature_request=state["feature_request"].description,
+            repo_context=repo_context,
+            cached_plan=cached.plan_json,
+        )
+        temperature = 0.3
+    else:
+        prompt = format_plan_prompt(
+            feature_request=state["feature_request"].description,
+            repo_context=repo_context,
+        )
+        temperature = 0.7
+
     # Generate plan using LLM
     router = get_router()
-    
+
     messages = [
-        LLMMessage(role="system", content=SYSTEM_PROMPT),
-        LLMMessage(
-            role="user",
-            content=format_plan_prompt(
-                feature_request=state["feature_request"].description,
-                repo_context=state["repo_context"],
-            ),
-        ),
+        SYSTEM_MSG,
+        LLMMessage(role="user", content=prompt),
     ]
-    
+
     response, provider, model = await router.chat_completion(
         messages=messages,
-        step=StepName.PLAN.value,
-        temperature=0.7,
-        response_format={"type": "json_object"},
+        step=StepName.PLAN,
+        temperature=temperature,
+        response_format=PLAN_RESPONSE_FORMAT,
     )
-    
+
     if not response.content:
-        state["errors"].append("Failed to generate plan: empty response")
-        return state
-    
-    # Parse plan from response
+        updates["errors"] = ["Failed to generate plan: empty response"]
+        return updates
+
+    # Parse plan from response; on failure escalate once to the reasoning
+    # tier, since small models occasionally break the JSON schema.
     try:
-        plan_data = json.loads(response.content)
-        state["plan"] = Plan(**plan_data)
-        logger.info(f"[{state['run_id']}] Generated plan: {state['plan'].title}")
-    except (json.JSONDecodeError, ValueError) as e:
-        state["errors"].append(f"Failed to parse plan: {e}")
-    
-    return state
+        updates["plan"] = Plan.model_validate_json(response.content)
+        logger.info(f"[{state['run_id']}] Generated plan: {updates['plan'].title}")
+    except ValidationError as e:
+        logger.warning(f"[{state['run_id']}] Small-model plan parse failed, escalating: {e}")
+        response, provider, model = await router.chat_completion(
+            messages=messages,
+            step=StepName.PLAN,
+            model_type="reasoning",
+            temperature=temperature,
+            response_format=PLAN_RESPONSE_FORMAT,
+        )
+        try:
+            updates["plan"] = Plan.model_validate_json(response.content or "")
+            logger.info(f"[{state['run_id']}] Generated plan: {updates['plan'].title}")
+        except ValidationError as e2:
+            updates["errors"] = [f"Failed to parse plan: {e2}"]
+
+    return updates
 
 
-async def checklist_node(state: AgentState) -> AgentState:
+async def checklist_node(state: AgentState) -> dict[str, Any]:
     """Generate implementation checklist from plan.
-    
+
     Input: plan
     Output: checklist
     """
     logger.info(f"[{state['run_id']}] Starting checklist_node")
-    
-    state["current_step"] = StepName.CHECKLIST.value
-    state["status"] = RunStatus.CHECKLIST.value
-    
+
+    updates: dict[str, Any] = {
+        "current_step": StepName.CHECKLIST.value,
+        "status": RunStatus.CHECKLIST.value,
+    }
+
     if not state["plan"]:
-        state["errors"].append("No plan available for checklist generation")
-        return state
-    
+        updates["errors"] = ["No plan available for checklist generation"]
+        return updates
+
     router = get_router()
-    
+
     messages = [
-        LLMMessage(role="system", content=SYSTEM_PROMPT),
+        SYSTEM_MSG,
         LLMMessage(
             role="user",
             content=format_checklist_prompt(state["plan"].to_markdown()),
         ),
     ]
-    
+
     response, provider, model = await router.chat_completion(
         messages=messages,
-        step=StepName.CHECKLIST.value,
+        step=StepName.CHECKLIST,
         temperature=0.5,
-        response_format={"type": "json_object"},
+        response_format=CHECKLIST_RESPONSE_FORMAT,
     )
-    
+
     if not response.content:
-        state["errors"].append("Failed to generate checklist: empty response")
-        return state
-    
+        updates["errors"] = ["Failed to generate checklist: empty response"]
+        return updates
+
     try:
-        checklist_data = json.loads(response.content)
-        items = [ChecklistItem(**item) for item in checklist_data.get("items", [])]
-        state["checklist"] = Checklist(
-            items=items,
-            test_strategy=checklist_data.get("test_strategy", "Run tests"),
+        updates["checklist"] = Checklist.model_validate_json(response.content)
+        logger.info(
+            f"[{state['run_id']}] Generated checklist with {len(updates['checklist'].items)} items"
         )
-        logger.info(f"[{state['run_id']}] Generated checklist with {len(items)} items")
-    except (json.JSONDecodeError, ValueError) as e:
-        state["errors"].append(f"Failed to parse checklist: {e}")
-    
-    return state
+    except ValidationError as e:
+        updates["errors"] = [f"Failed to parse checklist: {e}"]
+
+    return updates
+
+
+async def human_review(state: AgentState) -> dict[str, Any]:
+    """Interrupt point for checklist approval before any files are written.
+
+    The graph is compiled with interrupt_before=["human_review"], so runs
+    routed through this node pause at the checkpoint until resumed.
+    """
+    logger.info(f"[{state['run_id']}] Checklist approved, continuing to execute")
+    return {}
+
+
+def _ready_items(state: AgentState) -> list[ChecklistItem]:
+    """Checklist items whose dependencies are satisfied and not yet executed.
+
+    The checklist is LLM-generated, so dependency IDs that don't name any
+    item are an expected input; they are treated as satisfied rather than
+    deadlocking the item forever.
+    """
+    checklist = state.get("checklist")
+    if not checklist:
+        return []
+    completed = set(state.get("completed_ids", []))
+    known_ids = {item.id for item in checklist.items}
+    return [
+        item
+        for item in checklist.items
+        if item.id not in completed
+        and all(dep in completed or dep not in known_ids for dep in item.dependencies)
+    ]
+
+
+async def execute_dispatch(state: AgentState) -> dict[str, Any]:
+    """Mark the execute phase; fan-out happens in the conditional edge."""
+    logger.info(f"[{state['run_id']}] Starting execute_dispatch")
+    updates: dict[str, Any] = {
+        "current_step": StepName.EXECUTE.value,
+        "status": RunStatus.EXECUTING.value,
+    }
+
+    # With unknown dep IDs treated as satisfied, only a dependency cycle
+    # can leave incomplete items permanently unready. Record them as an
+    # error and settle them here, before the routing edge runs, so the
+    # dispatcher exits to materialize without silently dropping work.
+    checklist = state.get("checklist")
+    if checklist:
+        completed = set(state.get("completed_ids", []))
+        incomplete = [item.id for item in checklist.items if item.id not in completed]
+        if incomplete and not _ready_items(state):
+            logger.error(
+                f"[{state['run_id']}] Checklist items stuck in dependency cycle: {incomplete}"
+            )
+            updates["errors"] = [
+                f"Checklist items never became ready (dependency cycle): {incomplete}"
+            ]
+            updates["completed_ids"] = incomplete
+
+    return updates
+
 
+async def execute_one(substate: ExecuteItemState) -> dict[str, Any]:
+    """Execute a single checklist item by generating code changes.
 
-async def execute_node(state: AgentState) -> AgentState:
-    """Execute checklist items by generating code changes.
-    
-    Input: checklist, current_item_index
-    Output: patches, current_item_index (incremented)
+    Runs as a concurrent branch; returns only reducer-merged keys so
+    parallel branches can update state safely.
     """
-    logger.info(f"[{state['run_id']}] Starting execute_node")
-    
-    state["current_step"] = StepName.EXECUTE.value
-    state["status"] = RunStatus.EXECUTING.value
-    
-    if not state["checklist"]:
-        state["errors"].append("No checklist available for execution")
-        return state
-    
-    items = state["checklist"].items
-    current_idx = state["current_item_index"]
-    
-    if current_idx >= len(items):
-        logger.info(f"[{state['run_id']}] All items executed")
-        return state
-    
-    item = items[current_idx]
-    logger.info(f"[{state['run_id']}] Executing item {current_idx + 1}/{len(items)}: {item.description}")
-    
-    # Get current file content if modifying
-    file_content = ""
-    if item.file_path and item.action == "modify":
-        file_result = await read_file(state["repo_path"], item.file_path)
-        if file_result.ok:
-            file_content = file_result.data.get("content", "")
-    
+    item = substate["item"]
+    run_id = substate["run_id"]
+    logger.info(f"[{run_id}] Executing item {item.id}: {item.description}")
+
+    # File content was prefetched by the dispatcher for the whole batch
+    file_content = substate["file_content"]
+
     router = get_router()
-    
+
     messages = [
-        LLMMessage(role="system", content=SYSTEM_PROMPT),
+        SYSTEM_MSG,
         LLMMessage(
             role="user",
             content=format_execute_prompt(
                 checklist_item=json.dumps(item.model_dump()),
                 file_content=file_content or "(new file)",
-                repo_context=state["repo_context"],
+                repo_context=substate["repo_context"],
             ),
         ),
     ]
-    
+
     response, provider, model = await router.chat_completion(
         messages=messages,
-        step=StepName.EXECUTE.value,
+        step=StepName.EXECUTE,
         model_type="reasoning",  # Use reasoning model for code
         temperature=0.3,  # Lower temperature for code
-        response_format={"type": "json_object"},
+        response_format=EXECUTE_RESPONSE_FORMAT,
+        stream=True,  # Abort mid-stream on malformed JSON to save tokens
     )
-    
+
+    # Failed items settle into completed_ids deliberately: dependents run
+    # against the pre-edit file state instead of deadlocking the dispatcher,
+    # and the errors entry keeps the failure visible in the run result
     if not response.content:
-        state["errors"].append(f"Failed to execute item {item.id}: empty response")
-        state["retry_count"] += 1
-        return state
-    
+        return {
+            "errors": [f"Failed to execute item {item.id}: empty response"],
+            "completed_ids": [item.id],
+        }
+
     try:
-        exec_data = json.loads(response.content)
-        file_path = exec_data.get("file_path", item.file_path)
-        new_content = exec_data.get("new_content", "")
-        
+        result = ExecutionResult.model_validate_json(response.content)
+        file_path = result.file_path or item.file_path
+        new_content = result.new_content
+
         if file_path and new_content:
-            # Write the file
-            write_result = await write_file(state["repo_path"], file_path, new_content)
-            
-            if write_result.ok:
-                patch = ExecutionPatch(
-                    file_path=file_path,
-                    original_content=file_content if file_content else None,
-                    new_content=new_content,
-                    checklist_item_id=item.id,
-                )
-                state["patches"].append(patch)
-                item.completed = True
-                state["current_item_index"] = current_idx + 1
-                state["retry_count"] = 0
-                logger.info(f"[{state['run_id']}] Successfully wrote {file_path}")
-            else:
-                state["errors"].append(f"Failed to write file: {write_result.error_message}")
-                state["retry_count"] += 1
-        else:
-            state["current_item_index"] = current_idx + 1
-            
-    except (json.JSONDecodeError, ValueError) as e:
-        state["errors"].append(f"Failed to parse execution result: {e}")
-        state["retry_count"] += 1
-    
-    return state
+            # Buffer the change; materialize_node flushes all patches to
+            # disk in one batch once execution settles
+            patch = ExecutionPatch(
+                file_path=file_path,
+                original_content=file_content if file_content else None,
+                new_content=new_content,
+                checklist_item_id=item.id,
+            )
+            item.completed = True
+            logger.info(f"[{run_id}] Buffered change to {file_path}")
+            return {"patches": [patch], "completed_ids": [item.id]}
+
+        return {"completed_ids": [item.id]}
+
+    except ValidationError as e:
+        # Settles as completed for the same reason as the empty-response
+        # branch above: fail visibly, don't strand dependents
+        return {
+            "errors": [f"Failed to parse execution result: {e}"],
+            "completed_ids": [item.id],
+        }
+
+
+async def materialize_node(state: AgentState) -> dict[str, Any]:
+    """Flush buffered patches to the working tree in one concurrent batch.
 
+    execute_one branches only buffer new file contents; deferring the
+    actual writes here turns N sequential filesystem round-trips into a
+    single asyncio.gather. Last patch wins per path, and re-running after
+    a failed validation is idempotent.
+    """
+    pending: dict[str, str] = {}
+    for patch in state.get("patches", []):
+        pending[patch.file_path] = patch.new_content
+
+    if not pending:
+        return {}
+
+    logger.info(f"[{state['run_id']}] Materializing {len(pending)} file(s)")
+
+    results = await asyncio.gather(
+        *[write_file(state["repo_path"], path, content) for path, content in pending.items()]
+    )
 
-async def validate_node(state: AgentState) -> AgentState:
+    errors = [
+        f"Failed to write file: {result.error_message}"
+        for result in results
+        if not result.ok
+    ]
+    return {"errors": errors} if errors else {}
+
+
+async def validate_node(state: AgentState) -> dict[str, Any]:
     """Validate changes by running tests and linting.
-    
+
     Input: patches
     Output: validation_results
     """
     logger.info(f"[{state['run_id']}] Starting validate_node")
-    
-    state["current_step"] = StepName.VALIDATE.value
-    state["status"] = RunStatus.VALIDATING.value
-    
+
+    updates: dict[str, Any] = {
+        "current_step": StepName.VALIDATE.value,
+        "status": RunStatus.VALIDATING.value,
+    }
+
     checks = {}
     errors = []
-    
-    # Run linter
-    lint_result = await run_linter(state["repo_path"])
+
+    # Lint and tests are independent sandbox processes; run them concurrently
+    # so validation latency is max(lint, tests) instead of their sum.
+    lint_result, test_result = await asyncio.gather(
+        run_linter(state["repo_path"]),
+        run_tests(state["repo_path"]),
+    )
+
     checks["lint"] = lint_result.ok
     if not lint_result.ok:
         errors.append(f"Lint failed: {lint_result.error_message}")
-    
-    # Run tests
-    test_result = await run_tests(state["repo_path"])
+
     checks["tests"] = test_result.ok
     test_output = test_result.data.get("stdout", "") if test_result.data else ""
     if not test_result.ok:
         errors.append(f"Tests failed: {test_result.error_message}")
-    
+
     validation = ValidationResult(
         passed=all(checks.values()),
         checks=checks,
         errors=errors,
         test_output=test_output,
     )
-    
-    state["validation_results"].append(validation)
-    
+
+    updates["validation_results"] = [validation]
+    if not validation.passed:
+        updates["retry_count"] = state.get("retry_count", 0) + 1
+
     logger.info(f"[{state['run_id']}] Validation: {'PASSED' if validation.passed else 'FAILED'}")
-    
-    return state
 
+    return updates
+
+
+def _hunk_is_noise(hunk_lines: list[str]) -> bool:
+    """True if every changed line in a hunk is whitespace-only."""
+    changed = [
+        line[1:]
+        for line in hunk_lines
+        if line.startswith(("+", "-")) and not line.startswith(("+++", "---"))
+    ]
+    return bool(changed) and all(not line.strip() for line in changed)
+
+
+async def compress_diff(diff: str, max_tokens: int = 2000) -> str:
+    """Compress a unified diff to fit the summary prompt budget.
+
+    Deterministic pass first: drop whitespace-only hunks and elide long
+    unchanged context runs. Only if the result still exceeds the budget is
+    a cheap model asked to digest it — so small diffs never cost an extra
+    LLM call.
+    """
+    max_chars = max_tokens * 4  # rough chars-per-token heuristic
+
+    if len(diff) <= max_chars:
+        return diff
+
+    # Deterministic compression: walk hunks, drop noise, elide context
+    kept: list[str] = []
+    hunk: list[str] = []
+
+    def flush_hunk() -> None:
+        if not hunk:
+            return
+        if not _hunk_is_noise(hunk):
+            context_run: list[str] = []
+            for line in hunk:
+                if line.startswith(" "):
+                    context_run.append(line)
+                    continue
+                if len(context_run) > 6:
+                    kept.extend(context_run[:3])
+                    kept.append(f"... {len(context_run) - 3} lines unchanged ...")
+                else:
+                    kept.extend(context_run)
+                context_run = []
+                kept.append(line)
+            if len(context_run) > 3:
+                kept.append(f"... {len(context_run)} lines unchanged ...")
+            else:
+                kept.extend(context_run)
+        hunk.clear()
 
-async def summary_node(state: AgentState) -> AgentState:
+    for line in diff.splitlines():
+        if line.startswith(("diff --git", "@@", "+++", "---", "index ")):
+            flush_hunk()
+            kept.append(line)
+        else:
+            hunk.append(line)
+    flush_hunk()
+
+    compressed = "\n".join(kept)
+    if len(compressed) <= max_chars:
+        return compressed
+
+    # Still over budget: digest with the cheap model
+    router = get_router()
+    response, provider, model = await router.chat_completion(
+        messages=[
+            LLMMessage(
+                role="user",
+                content=format_diff_digest_prompt(compressed[:max_chars * 4], max_tokens),
+            ),
+        ],
+        step=StepName.SUMMARY,
+        model_type="fast",
+        temperature=0.2,
+        max_tokens=max_tokens,
+    )
+    if response.content:
+        return response.content
+
+    # Digest failed; fall back to hard truncation
+    return compressed[:max_chars]
+
+
+async def summary_node(state: AgentState) -> dict[str, Any]:
     """Generate final run summary.
-    
+
     Input: feature_request, patches, validation_results
     Output: summary
     """
     logger.info(f"[{state['run_id']}] Starting summary_node")
-    
-    state["current_step"] = StepName.SUMMARY.value
-    state["status"] = RunStatus.SUMMARIZING.value
-    
-    # Get diff
+
+    updates: dict[str, Any] = {
+        "current_step": StepName.SUMMARY.value,
+        "status": RunStatus.SUMMARIZING.value,
+    }
+
+    # Get diff, compressed to the summary prompt's token budget
     diff_result = await git_diff(state["repo_path"])
     diff_content = diff_result.data.get("diff", "") if diff_result.ok else ""
-    
+    diff_content = await compress_diff(diff_content)
+
     # Build changes summary
     changes = []
     for patch in state["patches"]:
         changes.append(f"- Modified `{patch.file_path}`")
-    
+
     # Get test results summary
     test_passed = all(v.passed for v in state["validation_results"])
     test_summary = "All tests passed" if test_passed else "Some tests failed"
-    
+
     router = get_router()
-    
+
     messages = [
-        LLMMessage(role="system", content=SYSTEM_PROMPT),
+        SYSTEM_MSG,
         LLMMessage(
             role="user",
             content=format_summary_prompt(
                 feature_request=state["feature_request"].description,
-                changes="\n".join(changes) + f"\n\n### Diff\n```diff\n{diff_content[:5000]}\n```",
+                changes="\n".join(changes) + f"\n\n### Diff\n```diff\n{diff_content}\n```",
                 test_results=test_summary,
             ),
         ),
     ]
-    
+
     response, provider, model = await router.chat_completion(
         messages=messages,
-        step=StepName.SUMMARY.value,
+        step=StepName.SUMMARY,
         temperature=0.5,
-        response_format={"type": "json_object"},
+        response_format=SUMMARY_RESPONSE_FORMAT,
     )
-    
+
     if response.content:
         try:
-            summary_data = json.loads(response.content)
-            state["summary"] = RunSummary(
-                title=summary_data.get("title", "Changes"),
-                description=summary_data.get("description", ""),
-                changes_made=summary_data.get("changes_made", []),
-                files_changed=[p.file_path for p in state["patches"]],
-                tests_passed=test_passed,
-                verification_steps=summary_data.get("verification_steps", []),
-                risk_notes=summary_data.get("risk_notes", []),
+            # Model output is schema-constrained; files_changed and the test
+            # outcome are still authoritative from local state.
+            updates["summary"] = RunSummary.model_validate_json(response.content).model_copy(
+                update={
+                    "files_changed": [p.file_path for p in state["patches"]],
+                    "tests_passed": test_passed,
+                }
             )
-        except (json.JSONDecodeError, ValueError) as e:
+        except ValidationError as e:
             logger.error(f"Failed to parse summary: {e}")
-    
-    state["status"] = RunStatus.COMPLETED.value
-    state["ended_at"] = datetime.utcnow().isoformat()
-    
-    return state
+
+    # Successful runs seed the plan cache for future similar requests
+    if test_passed and state.get("plan"):
+        await store_cached_plan(
+            goal_text=state["feature_request"].description,
+            plan_json=state["plan"].model_dump_json(),
+            checklist_json=state["checklist"].model_dump_json() if state.get("checklist") else None,
+        )
+
+    updates["status"] = RunStatus.COMPLETED.value
+    updates["ended_at"] = datetime.now(timezone.utc).isoformat()
+
+    return updates
 
 
 # =============================================================================
 # Routing Functions
 # =============================================================================
 
-def should_continue_execution(state: AgentState) -> Literal["execute", "validate", "summary"]:
-    """Determine next step after execution."""
-    if not state["checklist"]:
+async def dispatch_ready_items(state: AgentState) -> list[Send] | Literal["materialize", "summary"]:
+    """Fan out all ready checklist items as concurrent execute_one branches.
+
+    Target files for the batch are prefetched with one asyncio.gather so the
+    per-item reads overlap instead of serializing inside each branch.
+    """
+    if not state.get("checklist"):
         return "summary"
-    
-    if state["current_item_index"] < len(state["checklist"].items):
-        return "execute"
-    
-    return "validate"
+
+    ready = _ready_items(state)
+    if not ready:
+        return "materialize"
+
+    # Prefetch current contents of all files the batch will modify. Writes
+    # are buffered until materialize_node, so earlier patches in this run
+    # overlay whatever is on disk.
+    contents = {patch.file_path: patch.new_content for patch in state.get("patches", [])}
+    paths = sorted(
+        {
+            item.file_path
+            for item in ready
+            if item.file_path and item.action == "modify" and item.file_path not in contents
+        }
+    )
+    reads = await asyncio.gather(*[read_file(state["repo_path"], p) for p in paths])
+    contents.update(
+        {
+            path: (result.data.get("content", "") if result.ok else "")
+            for path, result in zip(paths, reads)
+        }
+    )
+
+    return [
+        Send(
+            "execute_one",
+            ExecuteItemState(
+                run_id=state["run_id"],
+                repo_path=state["repo_path"],
+                repo_context=state["repo_context"],
+                item=item,
+                file_content=contents.get(item.file_path or "", ""),
+            ),
+        )
+        for item in ready
+    ]
+
+
+def should_pause_for_review(state: AgentState) -> Literal["human_review", "execute_dispatch"]:
+    """Route through the review interrupt when the request asks for approval."""
+    if state["feature_request"].require_approval:
+        return "human_review"
+    return "execute_dispatch"
 
 
 def should_retry_or_continue(state: AgentState) -> Literal["execute", "summary"]:
@@ -440,10 +776,10 @@ def should_retry_or_continue(state: AgentState) -> Literal["execute", "summary"]
         last_validation = state["validation_results"][-1]
         if last_validation.passed:
             return "summary"
-    
-    if state["retry_count"] >= MAX_RETRIES:
+
+    if state.get("retry_count", 0) >= MAX_RETRIES:
         return "summary"
-    
+
     # Otherwise continue execution
     return "execute"
 
@@ -455,50 +791,68 @@ def should_retry_or_continue(state: AgentState) -> Literal["execute", "summary"]
 def build_workflow() -> StateGraph:
     """Build the LangGraph workflow."""
     workflow = StateGraph(AgentState)
-    
+
     # Add nodes
     workflow.add_node("plan", plan_node)
     workflow.add_node("checklist", checklist_node)
-    workflow.add_node("execute", execute_node)
+    workflow.add_node("human_review", human_review)
+    workflow.add_node("execute_dispatch", execute_dispatch)
+    workflow.add_node("execute_one", execute_one)
+    workflow.add_node("materialize", materialize_node)
     workflow.add_node("validate", validate_node)
     workflow.add_node("summary", summary_node)
-    
+
     # Set entry point
     workflow.set_entry_point("plan")
-    
+
     # Add edges
     workflow.add_edge("plan", "checklist")
-    workflow.add_edge("checklist", "execute")
-    
-    # Conditional edge after execute
+
+    # Optional pause for checklist approval before any writes
     workflow.add_conditional_edges(
-        "execute",
-        should_continue_execution,
+        "checklist",
+        should_pause_for_review,
         {
-            "execute": "execute",
-            "validate": "validate",
-            "summary": "summary",
+            "human_review": "human_review",
+            "execute_dispatch": "execute_dispatch",
         },
     )
-    
+    workflow.add_edge("human_review", "execute_dispatch")
+
+    # Fan out ready items; once none remain, flush writes then validate
+    workflow.add_conditional_edges(
+        "execute_dispatch",
+        dispatch_ready_items,
+        ["execute_one", "materialize", "summary"],
+    )
+
+    # Each completed branch re-enters the dispatcher to release dependents
+    workflow.add_edge("execute_one", "execute_dispatch")
+    workflow.add_edge("materialize", "validate")
+
     # Conditional edge after validate
     workflow.add_conditional_edges(
         "validate",
         should_retry_or_continue,
         {
-            "execute": "execute",
+            "execute": "execute_dispatch",
             "summary": "summary",
         },
     )
-    
+
     # Summary goes to end
     workflow.add_edge("summary", END)
-    
+
     return workflow
 
 
-# Compiled workflow
-agent_workflow = build_workflow().compile()
+# Compiled workflow, checkpointed so interrupted runs resume from the last
+# successful node instead of re-spending every prior LLM call.
+checkpointer = AsyncSqliteSaver(aiosqlite.connect(CHECKPOINT_DB))
+agent_workflow = build_workflow().compile(
+    checkpointer=checkpointer,
+    interrupt_before=["human_review"],
+)
 
 
 # =============================================================================
@@ -507,35 +861,32 @@ agent_workflow = build_workflow().compile()
 
 async def run_agent(feature_request: FeatureRequest, run_id: str | None = None) -> AgentState:
     """Execute the full agent workflow.
-    
+
     Args:
         feature_request: The feature to implement
         run_id: Optional run ID (generated if not provided)
-        
+
     Returns:
         Final agent state with all artifacts
     """
     state = initial_state(feature_request, run_id)
-    
+
     logger.info(f"Starting agent run {state['run_id']}")
-    
+
     # Create branch for changes
     branch_name = f"devflow/{state['run_id'][:8]}"
     await git_create_branch(state["repo_path"], branch_name)
-    
-    # Run workflow
-    async for step_state in agent_workflow.astream(state):
-        # Update state from step
-        if isinstance(step_state, dict):
-            for key, value in step_state.items():
-                if isinstance(value, dict):
-                    state.update(value)
-    
+
+    # Run workflow; reducers merge concurrent branch updates. The thread_id
+    # keys checkpoints so a retried run_id resumes instead of restarting.
+    config = {"configurable": {"thread_id": state["run_id"]}}
+    state = await agent_workflow.ainvoke(state, config=config)
+
     # Commit changes if any
     if state["patches"]:
         commit_msg = f"feat: {state['plan'].title if state['plan'] else 'DevFlow changes'}"
         await git_commit(state["repo_path"], commit_msg)
-    
+
     logger.info(f"Agent run {state['run_id']} completed with status {state['status']}")
-    
+
     return state
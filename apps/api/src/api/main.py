@@ -5,11 +5,19 @@ from __future__ import annotations
 import logging
 from contextlib import asynccontextmanager
 
+import redis.asyncio as aioredis
+import uvloop
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.middleware.gzip import GZipMiddleware
+from fastapi.responses import ORJSONResponse
+from fastapi_cache import FastAPICache
+from fastapi_cache.backends.redis import RedisBackend
+from fastapi_cache.decorator import cache
 
-from src.config import get_settings
+from src.config import CORS_ORIGINS, get_settings
 from src.database.session import init_db, close_db
+from src.api.queue import broker
 from src.api.routes import router
 
 
@@ -22,6 +30,12 @@ logger = logging.getLogger(__name__)
 
 settings = get_settings()
 
+# Use uvloop for all event loops in this process (covers programmatic
+# starts and the FastStream worker importing this module); the app is
+# network/DB-bound, so faster socket I/O and task scheduling pay off on
+# every request
+uvloop.install()
+
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
@@ -33,11 +47,22 @@ async def lifespan(app: FastAPI):
     if settings.environment == "development":
         await init_db()
         logger.info("Database initialized")
-    
+
+    # Connect the job-queue broker so endpoints can publish runs
+    await broker.connect()
+
+    # Response cache for idempotent read endpoints; clients poll run
+    # status on a timer, so short TTLs cut most Postgres round-trips
+    FastAPICache.init(
+        RedisBackend(aioredis.from_url(str(settings.redis_url))),
+        prefix="devflow",
+    )
+
     yield
-    
+
     # Shutdown
     logger.info("Shutting down...")
+    await broker.close()
     await close_db()
 
 
@@ -47,22 +72,28 @@ app = FastAPI(
     version=settings.app_version,
     description="DevFlow Agent API - Developer workflow automation",
     lifespan=lifespan,
+    default_response_class=ORJSONResponse,
 )
 
 # Configure CORS
 app.add_middleware(
     CORSMiddleware,
-    allow_origins=settings.cors_origins,
+    allow_origins=CORS_ORIGINS,
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
 )
 
+# Compress large responses (markdown artifacts and diffs shrink 3-10x);
+# the minimum_size floor keeps small status payloads out of the gzip path
+app.add_middleware(GZipMiddleware, minimum_size=1024)
+
 # Include routes
 app.include_router(router, prefix="/api")
 
 
 @app.get("/")
+@cache(expire=30)
 async def root():
     """Root endpoint."""
     return {
@@ -75,9 +106,18 @@ async def root():
 if __name__ == "__main__":
     import uvicorn
     
+    # For multi-worker deployments run:
+    #   uvicorn src.api.main:app --workers N --loop uvloop --http httptools
+    # HTTP/2 should be terminated at the reverse proxy; uvicorn speaks
+    # HTTP/1.1 with keep-alive below
     uvicorn.run(
         "src.api.main:app",
         host=settings.api_host,
         port=settings.api_port,
         reload=settings.debug,
+        loop="uvloop",
+        http="httptools",
+        # Polling clients reuse connections instead of paying a fresh
+        # TCP+TLS handshake every few seconds
+        timeout_keep_alive=30,
     )
@@ -0,0 +1,197 @@
+"""Redis job queue for agent runs (FastStream).
+
+POST /runs publishes onto the ``agent_runs`` channel and returns immediately;
+a separate worker process consumes the queue and drives the workflow, so
+minutes-long LLM runs never occupy an API worker. Run the worker with:
+
+    faststream run src.api.queue:app
+"""
+
+from __future__ import annotations
+
+import asyncio
+import gzip
+import hashlib
+import logging
+from datetime import datetime, timezone
+from typing import Any
+
+import orjson
+import redis.asyncio as aioredis
+from faststream import FastStream
+from faststream.redis import RedisBroker
+from fastapi_cache import FastAPICache
+from fastapi_cache.backends.redis import RedisBackend
+from sqlalchemy import insert, update
+from sqlmodel import select
+
+from src.config import get_settings
+from src.database.models import Artifact, Run
+from src.database.session import get_session
+from src.schemas import FeatureRequest, RunStatus
+
+
+logger = logging.getLogger(__name__)
+
+settings = get_settings()
+
+# Channel carrying queued agent runs
+AGENT_RUNS_CHANNEL = "agent_runs"
+
+broker = RedisBroker(str(settings.redis_url))
+app = FastStream(broker)
+
+
+@app.on_startup
+async def _init_cache() -> None:
+    """Point the worker at the same response cache the API serves from.
+
+    Terminal run updates clear the run's cached GET responses; without
+    init, FastAPICache.clear would raise in the worker process (the API
+    process initializes it in its own lifespan).
+    """
+    FastAPICache.init(
+        RedisBackend(aioredis.from_url(str(settings.redis_url))),
+        prefix="devflow",
+    )
+
+
+async def _invalidate_run_cache(run_id: str) -> None:
+    """Drop cached run views after a terminal status update.
+
+    Best-effort: a cache hiccup must not fail the run update itself, and
+    stale entries age out via the short TTLs anyway.
+    """
+    try:
+        await FastAPICache.clear(namespace=f"run:{run_id}")
+    except Exception as e:
+        logger.warning(f"Cache invalidation failed for run {run_id}: {e}")
+
+
+def compress_patches(patches: list[Any]) -> bytes:
+    """Serialize execution patches with orjson and gzip for BYTEA storage."""
+    return gzip.compress(orjson.dumps([p.model_dump() for p in patches]))
+
+
+def decompress_patches(blob: bytes) -> list[dict[str, Any]]:
+    """Inverse of compress_patches; returns the raw patch dicts."""
+    return orjson.loads(gzip.decompress(blob))
+
+
+async def enqueue_run(run_id: str, feature_request: FeatureRequest) -> None:
+    """Publish a run onto the agent_runs channel."""
+    await broker.publish(
+        {"run_id": run_id, "feature_request": feature_request.model_dump()},
+        AGENT_RUNS_CHANNEL,
+    )
+
+
+@broker.subscriber(AGENT_RUNS_CHANNEL)
+async def handle_agent_run(payload: dict) -> None:
+    """Worker consumer: execute one queued agent run."""
+    run_id = payload["run_id"]
+    feature_request = FeatureRequest(**payload["feature_request"])
+    await execute_run_task(run_id, feature_request)
+
+
+async def execute_run_task(run_id: str, feature_request: FeatureRequest) -> None:
+    """Execute an agent run and persist its result + artifacts."""
+    # Imported here so the API process can publish without pulling in the
+    # full workflow (LangGraph, tools) at import time.
+    from src.agent.workflow import run_agent
+
+    try:
+        logger.info(f"Starting execution of run {run_id}")
+
+        # Run the agent
+        state = await run_agent(feature_request, run_id)
+
+        # Update run in database: one UPDATE ... WHERE (no SELECT) plus one
+        # multi-row INSERT for the rendered artifacts
+        values: dict[str, Any] = {
+            "status": state.get("status", RunStatus.COMPLETED.value),
+            "ended_at": datetime.now(timezone.utc),
+            "success": state.get("status") == RunStatus.COMPLETED.value,
+        }
+
+        # Structured results land in JSONB columns on the run row; bulky
+        # patch contents are gzip-compressed into BYTEA.
+        if state.get("plan"):
+            values["plan"] = state["plan"].model_dump(mode="json")
+        if state.get("checklist"):
+            values["checklist"] = state["checklist"].model_dump(mode="json")
+        if state.get("summary"):
+            values["summary"] = state["summary"].model_dump(mode="json")
+        if state.get("patches"):
+            values["patches"] = compress_patches(state["patches"])
+
+        # Rendered markdown artifacts for the API surface. Hashing runs in a
+        # worker thread: hashlib releases the GIL for large buffers, so the
+        # event loop keeps serving other runs while digests compute.
+        def build_artifact_rows() -> list[dict[str, Any]]:
+            rows: list[dict[str, Any]] = []
+            for artifact_type, model in (
+                ("plan_md", state.get("plan")),
+                ("checklist_md", state.get("checklist")),
+                ("summary_md", state.get("summary")),
+            ):
+                if model is None:
+                    continue
+                content = model.to_markdown()
+                encoded = content.encode()
+                rows.append(
+                    {
+                        "run_id": run_id,
+                        "artifact_type": artifact_type,
+                        "content": content,
+                        "content_hash": hashlib.sha256(encoded).hexdigest(),
+                        "size_bytes": len(encoded),
+                    }
+                )
+            return rows
+
+        artifact_rows = await asyncio.to_thread(build_artifact_rows)
+
+        async with get_session() as db:
+            result = await db.execute(
+                update(Run).where(Run.run_id == run_id).values(**values)
+            )
+            if result.rowcount and artifact_rows:
+                # Content-addressed dedup: when an identical artifact body is
+                # already stored, keep a pointer row (empty content, same
+                # hash); readers resolve the body via the hash index
+                existing = await db.execute(
+                    select(Artifact.content_hash).where(
+                        Artifact.content_hash.in_(
+                            [row["content_hash"] for row in artifact_rows]
+                        )
+                    )
+                )
+                known_hashes = set(existing.scalars().all())
+                for row in artifact_rows:
+                    if row["content_hash"] in known_hashes:
+                        row["content"] = ""
+                await db.execute(insert(Artifact), artifact_rows)
+            await db.commit()
+
+        await _invalidate_run_cache(run_id)
+
+        logger.info(f"Completed execution of run {run_id}")
+
+    except Exception as e:
+        logger.error(f"Error executing run {run_id}: {e}")
+
+        # Update run as failed (single UPDATE, no fetch)
+        async with get_session() as db:
+            await db.execute(
+                update(Run)
+                .where(Run.run_id == run_id)
+                .values(
+                    status=RunStatus.FAILED.value,
+                    error_message=str(e),
+                    ended_at=datetime.now(timezone.utc),
+                )
+            )
+            await db.commit()
+
+        await _invalidate_run_cache(run_id)
@@ -16,16 +16,21 @@ Authentication:
 from __future__ import annotations
 
 import logging
-from datetime import datetime
+from datetime import datetime, timezone
 from typing import Annotated
 from uuid import uuid4
 
-from fastapi import APIRouter, Depends, HTTPException, BackgroundTasks, Query
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
+from fastapi.responses import StreamingResponse
+from fastapi_cache import FastAPICache
+from fastapi_cache.decorator import cache
+from sqlalchemy import bindparam, func, update
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlmodel import select
 
-from src.config import get_settings
-from src.database.session import get_db
+from src.api.queue import decompress_patches, enqueue_run
+from src.config import DEEPSEEK_MODEL_CHAT, KIMI_MODEL, get_settings
+from src.database.session import get_db_ro, get_db_rw
 from src.database.models import Run, Artifact, User
 from src.schemas import (
     RunCreateRequest,
@@ -35,7 +40,6 @@ from src.schemas import (
     RunStatus,
     FeatureRequest,
 )
-from src.agent.workflow import run_agent
 
 
 logger = logging.getLogger(__name__)
@@ -43,12 +47,63 @@ router = APIRouter()
 
 settings = get_settings()
 
+# Status strings from the DB resolved through one dict lookup instead of
+# RunStatus(...) construction per row (visible on 100-item list pages)
+_STATUS_BY_VALUE = {status.value: status for status in RunStatus}
+
+
+def by_run_id(func, namespace, *, request=None, response=None, args=(), kwargs=None) -> str:
+    """Cache key from the run_id path param alone.
+
+    The default key builder hashes every remaining kwarg, and the injected
+    db session's repr embeds its instance address — keys never repeat and
+    the cache never hits. Keys are namespaced run:{run_id} so terminal
+    updates can clear all cached views of a run in one call.
+    """
+    run_id = (kwargs or {}).get("run_id", "")
+    return f"{FastAPICache.get_prefix()}:run:{run_id}:{func.__name__}"
+
+
+def _json_response(model) -> Response:
+    """Serialize a response model straight through Pydantic's Rust core.
+
+    Returning a prebuilt Response skips FastAPI's jsonable_encoder dict
+    detour, which dominates handler CPU on the list endpoints.
+    """
+    return Response(content=model.model_dump_json(), media_type="application/json")
+
+
+# Statements built once at import and parameterized per call, so handlers
+# skip per-request Core expression construction; SQL compilation itself is
+# memoized by the engine's compiled cache
+_STMT_GET_RUN = select(Run).where(Run.run_id == bindparam("run_id"))
+_STMT_RUN_EXISTS = select(Run.run_id).where(Run.run_id == bindparam("run_id"))
+_STMT_LIST_RUNS = (
+    select(Run)
+    .order_by(Run.created_at.desc())
+    .offset(bindparam("offset"))
+    .limit(bindparam("limit"))
+)
+_STMT_COUNT_RUNS = select(func.count()).select_from(Run)
+_STMT_RUN_ARTIFACTS = select(
+    Artifact.artifact_type, Artifact.content, Artifact.content_hash
+).where(Artifact.run_id == bindparam("run_id"))
+_STMT_ARTIFACT_BACKING = select(Artifact.content_hash, Artifact.content).where(
+    Artifact.content_hash.in_(bindparam("hashes", expanding=True)),
+    Artifact.content != "",
+)
+_STMT_GET_DIFF = select(Artifact.content).where(
+    Artifact.run_id == bindparam("run_id"),
+    Artifact.artifact_type == "diff",
+)
+
 
 # =============================================================================
 # Health Check
 # =============================================================================
 
 @router.get("/health")
+@cache(expire=30)
 async def health() -> dict:
     """Health check endpoint."""
     return {
@@ -65,12 +120,11 @@ async def health() -> dict:
 @router.post("/runs", response_model=RunResponse)
 async def create_run(
     request: RunCreateRequest,
-    background_tasks: BackgroundTasks,
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_db_rw),
 ) -> RunResponse:
     """Create a new agent run.
-    
-    The run will be queued and processed asynchronously.
+
+    The run is published to the Redis job queue and processed by a worker.
     Use GET /runs/{run_id} to poll for status updates.
     """
     run_id = str(uuid4())
@@ -83,18 +137,18 @@ async def create_run(
         feature_request=request.feature_request,
         base_branch=request.base_branch,
         status=RunStatus.QUEUED.value,
-        model_primary=settings.deepseek_model_chat,
-        model_fallback=settings.kimi_model,
-        created_at=datetime.utcnow(),
+        model_primary=DEEPSEEK_MODEL_CHAT,
+        model_fallback=KIMI_MODEL,
+        created_at=datetime.now(timezone.utc),
     )
     
     db.add(run)
+    # No refresh: created_at was set in Python and expire_on_commit=False
+    # keeps attributes loaded, so the extra SELECT round-trip buys nothing
     await db.commit()
-    await db.refresh(run)
-    
-    # Queue the run for background processing
-    background_tasks.add_task(
-        execute_run_task,
+
+    # Queue the run for a worker to pick up
+    await enqueue_run(
         run_id=run_id,
         feature_request=FeatureRequest(
             description=request.feature_request,
@@ -113,131 +167,66 @@ async def create_run(
     )
 
 
-async def execute_run_task(run_id: str, feature_request: FeatureRequest) -> None:
-    """Background task to execute an agent run."""
-    from src.database.session import get_session
-    
-    try:
-        logger.info(f"Starting execution of run {run_id}")
-        
-        # Run the agent
-        state = await run_agent(feature_request, run_id)
-        
-        # Update run in database
-        async with get_session() as db:
-            result = await db.execute(
-                select(Run).where(Run.run_id == run_id)
-            )
-            run = result.scalar_one_or_none()
-            
-            if run:
-                run.status = state.get("status", RunStatus.COMPLETED.value)
-                run.ended_at = datetime.utcnow()
-                run.success = state.get("status") == RunStatus.COMPLETED.value
-                
-                # Store artifacts
-                if state.get("plan"):
-                    artifact = Artifact(
-                        run_id=run_id,
-                        artifact_type="plan_md",
-                        content=state["plan"].to_markdown(),
-                    )
-                    db.add(artifact)
-                
-                if state.get("checklist"):
-                    artifact = Artifact(
-                        run_id=run_id,
-                        artifact_type="checklist_md",
-                        content=state["checklist"].to_markdown(),
-                    )
-                    db.add(artifact)
-                
-                if state.get("summary"):
-                    artifact = Artifact(
-                        run_id=run_id,
-                        artifact_type="summary_md",
-                        content=state["summary"].to_markdown(),
-                    )
-                    db.add(artifact)
-                
-                await db.commit()
-        
-        logger.info(f"Completed execution of run {run_id}")
-        
-    except Exception as e:
-        logger.error(f"Error executing run {run_id}: {e}")
-        
-        # Update run as failed
-        async with get_session() as db:
-            result = await db.execute(
-                select(Run).where(Run.run_id == run_id)
-            )
-            run = result.scalar_one_or_none()
-            if run:
-                run.status = RunStatus.FAILED.value
-                run.error_message = str(e)
-                run.ended_at = datetime.utcnow()
-                await db.commit()
-
-
 @router.get("/runs", response_model=RunListResponse)
 async def list_runs(
     page: int = Query(default=1, ge=1),
     per_page: int = Query(default=20, ge=1, le=100),
-    db: AsyncSession = Depends(get_db),
-) -> RunListResponse:
+    db: AsyncSession = Depends(get_db_ro),
+) -> Response:
     """List runs for the current user."""
     # TODO: Filter by user from auth
     offset = (page - 1) * per_page
     
     result = await db.execute(
-        select(Run)
-        .order_by(Run.created_at.desc())
-        .offset(offset)
-        .limit(per_page)
+        _STMT_LIST_RUNS, {"offset": offset, "limit": per_page}
     )
     runs = result.scalars().all()
     
-    # Get total count
-    count_result = await db.execute(select(Run))
-    total = len(count_result.scalars().all())
+    # Count in SQL; fetching every row just to len() it materializes the
+    # whole table per list call
+    count_result = await db.execute(_STMT_COUNT_RUNS)
+    total = count_result.scalar_one()
     
-    return RunListResponse(
-        runs=[
-            RunResponse(
-                run_id=run.run_id,
-                status=RunStatus(run.status),
-                current_step=run.current_step,
-                progress=run.progress,
-                message=run.error_message,
-                created_at=run.created_at,
-                updated_at=run.ended_at,
-            )
-            for run in runs
-        ],
-        total=total,
-        page=page,
-        per_page=per_page,
+    return _json_response(
+        RunListResponse(
+            runs=[
+                RunResponse(
+                    run_id=run.run_id,
+                    status=_STATUS_BY_VALUE[run.status],
+                    current_step=run.current_step,
+                    progress=run.progress,
+                    message=run.error_message,
+                    created_at=run.created_at,
+                    updated_at=run.ended_at,
+                )
+                for run in runs
+            ],
+            total=total,
+            page=page,
+            per_page=per_page,
+        )
     )
 
 
 @router.get("/runs/{run_id}", response_model=RunResponse)
+@cache(expire=2, key_builder=by_run_id)
 async def get_run(
     run_id: str,
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_db_ro),
 ) -> RunResponse:
     """Get run status by ID."""
-    result = await db.execute(
-        select(Run).where(Run.run_id == run_id)
-    )
+    result = await db.execute(_STMT_GET_RUN, {"run_id": run_id})
     run = result.scalar_one_or_none()
-    
+
     if not run:
         raise HTTPException(status_code=404, detail="Run not found")
-    
+
+    # Cached handlers must return the model, not a prebuilt Response:
+    # the cache's JSON coder can round-trip a model dict but not a
+    # Response object, and a cache hit skips this body anyway
     return RunResponse(
         run_id=run.run_id,
-        status=RunStatus(run.status),
+        status=_STATUS_BY_VALUE[run.status],
         current_step=run.current_step,
         progress=run.progress,
         message=run.error_message,
@@ -247,78 +236,121 @@ async def get_run(
 
 
 @router.get("/runs/{run_id}/artifacts", response_model=RunArtifactsResponse)
+@cache(expire=10, key_builder=by_run_id)
 async def get_run_artifacts(
     run_id: str,
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_db_ro),
 ) -> RunArtifactsResponse:
     """Get all artifacts from a run."""
-    result = await db.execute(
-        select(Run).where(Run.run_id == run_id)
-    )
+    result = await db.execute(_STMT_GET_RUN, {"run_id": run_id})
     run = result.scalar_one_or_none()
     
     if not run:
         raise HTTPException(status_code=404, detail="Run not found")
     
-    # Get artifacts
-    artifacts_result = await db.execute(
-        select(Artifact).where(Artifact.run_id == run_id)
-    )
-    artifacts = artifacts_result.scalars().all()
-    
+    # Get artifacts; selecting just the used columns returns plain tuples
+    # and skips ORM hydration of the text-heavy rows
+    artifacts_result = await db.execute(_STMT_RUN_ARTIFACTS, {"run_id": run_id})
+    rows = artifacts_result.all()
+
+    # Deduplicated pointer rows carry an empty body; resolve them through
+    # the content-hash index in one extra query
+    pointer_hashes = [h for _t, content, h in rows if not content and h]
+    backing: dict[str, str] = {}
+    if pointer_hashes:
+        backing_result = await db.execute(
+            _STMT_ARTIFACT_BACKING, {"hashes": pointer_hashes}
+        )
+        backing = dict(backing_result.all())
+
     response = RunArtifactsResponse(run_id=run_id)
-    
-    for artifact in artifacts:
-        if artifact.artifact_type == "plan_md":
-            response.plan_markdown = artifact.content
-        elif artifact.artifact_type == "checklist_md":
-            response.checklist_markdown = artifact.content
-        elif artifact.artifact_type == "summary_md":
-            response.summary_markdown = artifact.content
-        elif artifact.artifact_type == "diff":
-            response.diff = artifact.content
-    
+
+    for artifact_type, content, content_hash in rows:
+        if not content and content_hash:
+            content = backing.get(content_hash, "")
+        if artifact_type == "plan_md":
+            response.plan_markdown = content
+        elif artifact_type == "checklist_md":
+            response.checklist_markdown = content
+        elif artifact_type == "summary_md":
+            response.summary_markdown = content
+        elif artifact_type == "diff":
+            response.diff = content
+
+    if run.raw_events:
+        response.raw_events = run.raw_events
+
+    # Patches are stored gzip-compressed on the run row; build the diff view
+    # from them when no diff artifact was written
+    if response.diff is None and run.patches:
+        patch_diffs = [p["diff"] for p in decompress_patches(run.patches) if p.get("diff")]
+        if patch_diffs:
+            response.diff = "\n".join(patch_diffs)
+
+    # Model return, not _json_response: see get_run — the cache layer
+    # stores/rebuilds model dicts, not Response objects
     return response
 
 
+# Chunk size for streaming diff bodies to clients
+DIFF_STREAM_CHUNK_SIZE = 64 * 1024
+
+
 @router.get("/runs/{run_id}/diff")
 async def get_run_diff(
     run_id: str,
-    db: AsyncSession = Depends(get_db),
-) -> dict:
-    """Get the git diff from a run."""
-    result = await db.execute(
-        select(Artifact)
-        .where(Artifact.run_id == run_id)
-        .where(Artifact.artifact_type == "diff")
-    )
-    artifact = result.scalar_one_or_none()
-    
-    if not artifact:
+    db: AsyncSession = Depends(get_db_ro),
+) -> StreamingResponse:
+    """Get the git diff from a run as a plain-text stream.
+
+    Diffs can run to megabytes; streaming in 64KB chunks avoids the
+    JSON-escaped full-buffer copy and starts the response as soon as the
+    first chunk is ready. Clients that want JSON get the diff from
+    GET /runs/{run_id}/artifacts instead.
+    """
+    result = await db.execute(_STMT_GET_DIFF, {"run_id": run_id})
+    diff = result.scalar_one_or_none()
+
+    if diff is None:
         raise HTTPException(status_code=404, detail="Diff not found")
-    
-    return {"run_id": run_id, "diff": artifact.content}
+
+    async def chunks():
+        for i in range(0, len(diff), DIFF_STREAM_CHUNK_SIZE):
+            yield diff[i : i + DIFF_STREAM_CHUNK_SIZE]
+
+    return StreamingResponse(chunks(), media_type="text/plain")
 
 
 @router.delete("/runs/{run_id}")
 async def cancel_run(
     run_id: str,
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_db_rw),
 ) -> dict:
     """Cancel a running agent run."""
+    # Single conditional UPDATE instead of fetch-then-mutate; the status
+    # predicate makes the transition atomic under concurrent workers
     result = await db.execute(
-        select(Run).where(Run.run_id == run_id)
+        update(Run)
+        .where(
+            Run.run_id == run_id,
+            Run.status.in_(
+                [RunStatus.QUEUED.value, RunStatus.PLANNING.value, RunStatus.EXECUTING.value]
+            ),
+        )
+        .values(status=RunStatus.CANCELLED.value, ended_at=datetime.now(timezone.utc))
     )
-    run = result.scalar_one_or_none()
-    
-    if not run:
-        raise HTTPException(status_code=404, detail="Run not found")
-    
-    if run.status not in [RunStatus.QUEUED.value, RunStatus.PLANNING.value, RunStatus.EXECUTING.value]:
+
+    if result.rowcount == 0:
+        # Distinguish missing run from non-cancellable state
+        exists = await db.execute(_STMT_RUN_EXISTS, {"run_id": run_id})
+        if exists.scalar_one_or_none() is None:
+            raise HTTPException(status_code=404, detail="Run not found")
         raise HTTPException(status_code=400, detail="Run cannot be cancelled")
-    
-    run.status = RunStatus.CANCELLED.value
-    run.ended_at = datetime.utcnow()
+
     await db.commit()
-    
+
+    # Cancellation is terminal: drop cached status/artifact views so
+    # pollers see it immediately instead of after the TTL
+    await FastAPICache.clear(namespace=f"run:{run_id}")
+
     return {"status": "cancelled", "run_id": run_id}
@@ -10,16 +10,23 @@ Tables:
 
 from __future__ import annotations
 
-from datetime import datetime
+from datetime import datetime, timezone
 from typing import TYPE_CHECKING, Literal, Optional
 
-from sqlalchemy import Column, Text, Index
+from pgvector.sqlalchemy import BIT, HALFVEC, Vector
+from sqlalchemy import Column, LargeBinary, Text, Index, text
+from sqlalchemy.dialects.postgresql import JSONB
 from sqlmodel import Field, Relationship, SQLModel
 
 if TYPE_CHECKING:
     pass
 
 
+def utcnow() -> datetime:
+    """Timezone-aware default factory (datetime.utcnow is deprecated)."""
+    return datetime.now(timezone.utc)
+
+
 # =============================================================================
 # User Model
 # =============================================================================
@@ -35,11 +42,13 @@ class User(SQLModel, table=True):
     email: str | None = Field(default=None, description="Email from GitHub")
     avatar_url: str | None = Field(default=None, description="GitHub avatar URL")
     access_token_hash: str | None = Field(default=None, description="Hashed GitHub access token")
-    created_at: datetime = Field(default_factory=datetime.utcnow)
+    created_at: datetime = Field(default_factory=utcnow)
     updated_at: datetime | None = Field(default=None)
     
     # Relationships
-    runs: list["Run"] = Relationship(back_populates="user")
+    runs: list["Run"] = Relationship(
+        back_populates="user", sa_relationship_kwargs={"lazy": "raise"}
+    )
 
 
 # =============================================================================
@@ -52,6 +61,12 @@ class Run(SQLModel, table=True):
     __tablename__ = "runs"
     __table_args__ = (
         Index("ix_runs_user_created", "user_id", "created_at"),
+        # list_runs orders by created_at DESC globally; a matching index
+        # turns the paginated listing into an index walk instead of a sort
+        Index("ix_runs_created_desc", text("created_at DESC")),
+        # "active runs" dashboards filter status and sort by recency; the
+        # composite index serves both without touching the heap
+        Index("ix_runs_status_created", "status", "created_at"),
     )
     
     id: int | None = Field(default=None, primary_key=True)
@@ -78,19 +93,44 @@ class Run(SQLModel, table=True):
     total_tool_calls: int = Field(default=0)
     retry_count: int = Field(default=0)
     
-    # Timestamps
-    created_at: datetime = Field(default_factory=datetime.utcnow)
+    # Timestamps. created_at stays a Python-side default: SQLModel table
+    # models assign field defaults at init, so a server_default column
+    # would receive an explicit NULL from any Run() built without it, and
+    # create_run's no-refresh return depends on the value existing in
+    # Python before commit
+    created_at: datetime = Field(default_factory=utcnow)
     started_at: datetime | None = Field(default=None)
     ended_at: datetime | None = Field(default=None)
     
     # Success tracking
     success: bool | None = Field(default=None)
-    
+
+    # Result payloads. Structured fields are JSONB so Postgres can index and
+    # TOAST them natively; patches are gzip-compressed application-side
+    # (see src.api.queue) and stored as BYTEA with STORAGE EXTERNAL so
+    # Postgres skips its own column compression.
+    plan: dict | None = Field(default=None, sa_column=Column(JSONB))
+    checklist: dict | None = Field(default=None, sa_column=Column(JSONB))
+    summary: dict | None = Field(default=None, sa_column=Column(JSONB))
+    raw_events: list | None = Field(default=None, sa_column=Column(JSONB))
+    patches: bytes | None = Field(default=None, sa_column=Column(LargeBinary))
+
     # Relationships
-    user: User | None = Relationship(back_populates="runs")
-    steps: list["RunStep"] = Relationship(back_populates="run")
-    tool_calls: list["ToolCall"] = Relationship(back_populates="run")
-    artifacts: list["Artifact"] = Relationship(back_populates="run")
+    # lazy="raise" everywhere: async sessions cannot lazy-load anyway, and
+    # raising at access time surfaces a missing eager load as a clear error
+    # instead of an opaque MissingGreenlet
+    user: User | None = Relationship(
+        back_populates="runs", sa_relationship_kwargs={"lazy": "raise"}
+    )
+    steps: list["RunStep"] = Relationship(
+        back_populates="run", sa_relationship_kwargs={"lazy": "raise"}
+    )
+    tool_calls: list["ToolCall"] = Relationship(
+        back_populates="run", sa_relationship_kwargs={"lazy": "raise"}
+    )
+    artifacts: list["Artifact"] = Relationship(
+        back_populates="run", sa_relationship_kwargs={"lazy": "raise"}
+    )
 
 
 # =============================================================================
@@ -129,7 +169,9 @@ class RunStep(SQLModel, table=True):
     ended_at: datetime | None = Field(default=None)
     
     # Relationships
-    run: Run | None = Relationship(back_populates="steps")
+    run: Run | None = Relationship(
+        back_populates="steps", sa_relationship_kwargs={"lazy": "raise"}
+    )
 
 
 # =============================================================================
@@ -150,9 +192,10 @@ class ToolCall(SQLModel, table=True):
     
     tool_name: str = Field(index=True, description="Name of the tool called")
     
-    # Request/Response (stored as JSON strings)
-    request_json: str = Field(sa_column=Column(Text), description="Tool input as JSON")
-    response_json: str | None = Field(default=None, sa_column=Column(Text), description="Tool output as JSON")
+    # Request/Response (JSONB: no Python-side json round-trip, and server-side
+    # JSON path queries / GIN indexes stay available for log analytics)
+    request_json: dict = Field(sa_column=Column(JSONB), description="Tool input")
+    response_json: dict | None = Field(default=None, sa_column=Column(JSONB), description="Tool output")
     
     # Result
     ok: bool | None = Field(default=None)
@@ -164,10 +207,12 @@ class ToolCall(SQLModel, table=True):
     latency_ms: int | None = Field(default=None)
     
     # Timestamp
-    created_at: datetime = Field(default_factory=datetime.utcnow)
+    created_at: datetime = Field(default_factory=utcnow)
     
     # Relationships
-    run: Run | None = Relationship(back_populates="tool_calls")
+    run: Run | None = Relationship(
+        back_populates="tool_calls", sa_relationship_kwargs={"lazy": "raise"}
+    )
 
 
 # =============================================================================
@@ -180,6 +225,23 @@ class Artifact(SQLModel, table=True):
     __tablename__ = "artifacts"
     __table_args__ = (
         Index("ix_artifacts_run_type", "run_id", "artifact_type"),
+        # get_run_diff probes exactly (run_id, artifact_type='diff'); the
+        # partial index keeps that lookup a single small-index probe
+        Index(
+            "ix_artifacts_run_diff",
+            "run_id",
+            postgresql_where=text("artifact_type = 'diff'"),
+        ),
+        # Content-addressed dedup: lookups by hash, plus uniqueness of a
+        # given content per (run, type)
+        Index("ix_artifacts_content_hash", "content_hash"),
+        Index(
+            "ix_artifacts_run_type_hash",
+            "run_id",
+            "artifact_type",
+            "content_hash",
+            unique=True,
+        ),
     )
     
     id: int | None = Field(default=None, primary_key=True)
@@ -196,10 +258,75 @@ class Artifact(SQLModel, table=True):
     size_bytes: int | None = Field(default=None)
     
     # Timestamp
-    created_at: datetime = Field(default_factory=datetime.utcnow)
+    created_at: datetime = Field(default_factory=utcnow)
     
     # Relationships
-    run: Run | None = Relationship(back_populates="artifacts")
+    run: Run | None = Relationship(
+        back_populates="artifacts", sa_relationship_kwargs={"lazy": "raise"}
+    )
+
+
+# =============================================================================
+# Plan Cache (semantic reuse of successful plans/checklists)
+# =============================================================================
+
+class PlanCacheEntry(SQLModel, table=True):
+    """Cached plan/checklist from a successful run, keyed by goal embedding.
+
+    Looked up by cosine distance on goal_embedding so semantically similar
+    feature requests can adapt a proven plan instead of re-deriving one.
+    """
+
+    __tablename__ = "plan_cache"
+    __table_args__ = (
+        Index(
+            "ix_plan_cache_goal_embedding",
+            "goal_embedding",
+            postgresql_using="ivfflat",
+            postgresql_ops={"goal_embedding": "vector_cosine_ops"},
+            postgresql_with={"lists": 100},
+        ),
+    )
+
+    id: int | None = Field(default=None, primary_key=True)
+    goal_text: str = Field(sa_column=Column(Text), description="Original feature request text")
+    goal_embedding: list[float] = Field(sa_column=Column(Vector(1536)))
+    plan_json: str = Field(sa_column=Column(Text), description="Plan as JSON")
+    checklist_json: str | None = Field(default=None, sa_column=Column(Text))
+    success: bool = Field(default=True, index=True, description="Whether the source run passed tests")
+    created_at: datetime = Field(default_factory=utcnow)
+
+
+# =============================================================================
+# Workflow Examples (Issue -> PR dataset for RAG few-shot retrieval)
+# =============================================================================
+
+class WorkflowExample(SQLModel, table=True):
+    """An indexed workflow example (issue -> PR) for similarity retrieval.
+
+    Embeddings are stored quantized: fp16 (halfvec, 2x smaller than fp32)
+    for exact re-ranking and sign-binarized bits (32x smaller) for the
+    coarse ANN stage, so queries scan a fraction of the bytes a full fp32
+    column would.
+    """
+
+    __tablename__ = "workflow_examples"
+    __table_args__ = (
+        Index(
+            "ix_workflow_examples_embedding_bits",
+            "embedding_bits",
+            postgresql_using="ivfflat",
+            postgresql_ops={"embedding_bits": "bit_hamming_ops"},
+            postgresql_with={"lists": 100},
+        ),
+    )
+
+    id: int | None = Field(default=None, primary_key=True)
+    title: str = Field(description="Short description of the workflow")
+    payload_json: str = Field(sa_column=Column(Text), description="Full workflow payload as JSON")
+    embedding: list[float] = Field(sa_column=Column(HALFVEC(1536)))
+    embedding_bits: str = Field(sa_column=Column(BIT(1536)))
+    created_at: datetime = Field(default_factory=utcnow)
 
 
 # =============================================================================
@@ -220,15 +347,15 @@ class LLMCallLog(SQLModel, table=True):
     model: str = Field(description="Model name used")
     
     # Request (stored for replay/debugging)
-    messages_json: str = Field(sa_column=Column(Text), description="Input messages as JSON")
+    messages_json: list = Field(sa_column=Column(JSONB), description="Input messages")
     
     # Response
     response_content: str | None = Field(default=None, sa_column=Column(Text))
-    tool_calls_json: str | None = Field(default=None, sa_column=Column(Text))
+    tool_calls_json: list | None = Field(default=None, sa_column=Column(JSONB))
     finish_reason: str | None = Field(default=None)
     
     # Raw response (for debugging)
-    raw_response_json: str | None = Field(default=None, sa_column=Column(Text))
+    raw_response_json: dict | None = Field(default=None, sa_column=Column(JSONB))
     
     # Token usage
     prompt_tokens: int = Field(default=0)
@@ -241,4 +368,4 @@ class LLMCallLog(SQLModel, table=True):
     error_message: str | None = Field(default=None)
     
     # Timestamp
-    created_at: datetime = Field(default_factory=datetime.utcnow)
+    created_at: datetime = Field(default_factory=utcnow)
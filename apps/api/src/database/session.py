@@ -5,6 +5,8 @@ from __future__ import annotations
 from contextlib import asynccontextmanager
 from typing import AsyncGenerator
 
+import orjson
+from sqlalchemy import text
 from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 from sqlmodel import SQLModel
 
@@ -13,18 +15,26 @@ from src.config import get_settings
 
 settings = get_settings()
 
-# Convert sync URL to async
-DATABASE_URL = str(settings.database_url).replace(
-    "postgresql+psycopg://",
-    "postgresql+psycopg://",
-)
+# psycopg 3 drives both sync and async engines off the same URL, so no
+# driver rewrite is needed here (and no second dependency like asyncpg)
+DATABASE_URL = str(settings.database_url)
 
-# Create async engine
+# Create async engine. Pre-ping drops stale connections before they hit a
+# handler, recycle keeps them younger than typical server/LB idle timeouts,
+# and LIFO checkout reuses hot connections. Behind PgBouncer, use NullPool
+# and let the bouncer multiplex instead.
 engine = create_async_engine(
     DATABASE_URL,
     echo=settings.debug,
     pool_size=settings.database_pool_size,
     max_overflow=settings.database_max_overflow,
+    pool_timeout=settings.database_pool_timeout,
+    pool_pre_ping=True,
+    pool_recycle=settings.database_pool_recycle,
+    pool_use_lifo=True,
+    # JSONB columns encode/decode through orjson instead of stdlib json
+    json_serializer=lambda obj: orjson.dumps(obj).decode(),
+    json_deserializer=orjson.loads,
 )
 
 # Session factory
@@ -43,6 +53,11 @@ async def init_db() -> None:
     """
     async with engine.begin() as conn:
         await conn.run_sync(SQLModel.metadata.create_all)
+        # patches is gzip-compressed before insert, so Postgres column
+        # compression would just burn CPU on incompressible bytes
+        await conn.execute(
+            text("ALTER TABLE runs ALTER COLUMN patches SET STORAGE EXTERNAL")
+        )
 
 
 async def close_db() -> None:
@@ -62,8 +77,8 @@ async def get_session() -> AsyncGenerator[AsyncSession, None]:
             raise
 
 
-async def get_db() -> AsyncGenerator[AsyncSession, None]:
-    """Dependency for FastAPI routes."""
+async def get_db_rw() -> AsyncGenerator[AsyncSession, None]:
+    """Dependency for FastAPI routes that write; commits on success."""
     async with async_session_maker() as session:
         try:
             yield session
@@ -71,3 +86,13 @@ async def get_db() -> AsyncGenerator[AsyncSession, None]:
         except Exception:
             await session.rollback()
             raise
+
+
+async def get_db_ro() -> AsyncGenerator[AsyncSession, None]:
+    """Dependency for read-only routes.
+
+    No COMMIT round-trip on exit; the connection pool's reset-on-return
+    closes out the implicit read transaction.
+    """
+    async with async_session_maker() as session:
+        yield session
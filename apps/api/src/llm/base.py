@@ -3,11 +3,83 @@
 from __future__ import annotations
 
 from abc import ABC, abstractmethod
-from typing import Any
+from typing import Any, AsyncIterator
+
+import httpx
+import msgspec
 
 from src.schemas import LLMMessage, LLMRequest, LLMResponse
 
 
+# Shared connection-pool shape for adapter HTTP clients. With http2=True the
+# providers multiplex concurrent completions over a handful of TLS
+# connections instead of paying a handshake per in-flight request.
+CLIENT_LIMITS = httpx.Limits(
+    max_connections=64,
+    max_keepalive_connections=32,
+    keepalive_expiry=60,
+)
+
+
+# Wire shape of an OpenAI-compatible chat completion, restricted to the
+# fields the adapters actually read. msgspec decodes straight into these
+# structs and skips materializing the rest of the body (logprobs,
+# system_fingerprint, per-token details) as Python objects.
+
+class WireMessage(msgspec.Struct):
+    content: str | None = None
+    tool_calls: list[dict[str, Any]] | None = None
+
+
+class WireChoice(msgspec.Struct):
+    message: WireMessage = msgspec.field(default_factory=WireMessage)
+    finish_reason: str | None = None
+
+
+class ChatCompletionWire(msgspec.Struct):
+    choices: list[WireChoice] = msgspec.field(default_factory=list)
+    model: str | None = None
+    # Any, not int: providers nest objects here (DeepSeek ships
+    # prompt_tokens_details), and a strict value type would make the
+    # decoder reject every successful response
+    usage: dict[str, Any] = msgspec.field(default_factory=dict)
+
+
+# Reusable decoder: building one per call would re-derive the type info
+WIRE_DECODER = msgspec.json.Decoder(ChatCompletionWire)
+
+
+# Pre-serialized payloads for long-lived shared messages (e.g. the system
+# prompt singleton), keyed by object id. Registration keeps a strong
+# reference to the message, so an id can never be recycled to a different
+# object while its entry exists.
+_static_messages: dict[int, tuple[LLMMessage, dict[str, Any]]] = {}
+
+
+def register_static_message(message: LLMMessage) -> LLMMessage:
+    """Pre-serialize a message reused across many calls.
+
+    Adapters then skip model_dump for it on every request, and the payload
+    bytes are guaranteed identical call to call — a precondition for
+    provider prefix caches to hit.
+    """
+    _static_messages[id(message)] = (message, message.as_payload)
+    return message
+
+
+def _serialize_message(message: LLMMessage) -> dict[str, Any]:
+    """Serialize one message, short-circuiting registered shared instances.
+
+    Non-registered messages hit LLMMessage.as_payload, which is cached per
+    instance — so a fallback call after a failed primary attempt reuses the
+    dicts built for the first request instead of re-dumping the history.
+    """
+    static = _static_messages.get(id(message))
+    if static is not None:
+        return static[1]
+    return message.as_payload
+
+
 class LLMAdapter(ABC):
     """Abstract base class for LLM provider adapters.
     
@@ -35,7 +107,7 @@ class LLMAdapter(ABC):
         temperature: float = 0.7,
         max_tokens: int = 4096,
         tools: list[dict[str, Any]] | None = None,
-        response_format: dict[str, str] | None = None,
+        response_format: dict[str, Any] | None = None,
     ) -> LLMResponse:
         """Send a chat completion request.
         
@@ -52,6 +124,22 @@ class LLMAdapter(ABC):
         """
         ...
     
+    def stream_chat_completion(
+        self,
+        messages: list[LLMMessage],
+        model: str | None = None,
+        temperature: float = 0.7,
+        max_tokens: int = 4096,
+        tools: list[dict[str, Any]] | None = None,
+        response_format: dict[str, Any] | None = None,
+    ) -> AsyncIterator[dict[str, Any]]:
+        """Stream raw completion chunks (SSE) from the provider.
+
+        Yields the parsed chunk objects as dicts. Providers that do not
+        support streaming may leave this unimplemented.
+        """
+        raise NotImplementedError(f"{self.provider_name} does not support streaming")
+
     @abstractmethod
     async def health_check(self) -> bool:
         """Check if the provider API is accessible.
@@ -68,15 +156,20 @@ class LLMAdapter(ABC):
         temperature: float,
         max_tokens: int,
         tools: list[dict[str, Any]] | None,
-        response_format: dict[str, str] | None,
+        response_format: dict[str, Any] | None,
     ) -> dict[str, Any]:
         """Build the API request payload.
         
         This is a helper method that subclasses can use or override.
+
+        ``cache_control`` is stripped here: OpenAI-compatible providers
+        (DeepSeek, Kimi) cache shared prefixes automatically, so the hint only
+        needs explicit translation for providers with opt-in caching
+        (Anthropic ``cache_control`` blocks, Bedrock Converse ``cachePoint``).
         """
         payload: dict[str, Any] = {
             "model": model,
-            "messages": [m.model_dump(exclude_none=True) for m in messages],
+            "messages": [_serialize_message(m) for m in messages],
             "temperature": temperature,
             "max_tokens": max_tokens,
         }
@@ -0,0 +1,123 @@
+"""Content-addressed LLM response cache.
+
+Repeated runs and dev iteration re-send byte-identical JSON-mode prompts
+(execute at temperature 0.3, checklist at 0.5). For low-temperature calls the
+response is effectively deterministic, so we cache it in Redis keyed by a
+SHA-256 of the full request shape and skip the API round-trip entirely.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import logging
+from typing import Any, Protocol
+
+import redis.asyncio as aioredis
+
+from src.config import get_settings
+from src.schemas import LLMMessage, LLMResponse
+
+
+logger = logging.getLogger(__name__)
+
+# Default cache entry lifetime (24 hours)
+DEFAULT_TTL_SECONDS = 24 * 60 * 60
+
+# Calls above this temperature are treated as non-deterministic and never cached
+MAX_CACHEABLE_TEMPERATURE = 0.3
+
+
+class CacheBackend(Protocol):
+    """Minimal async key/value store interface for the LLM cache."""
+
+    async def get(self, key: str) -> str | None: ...
+
+    async def set(self, key: str, value: str, ttl_seconds: int) -> None: ...
+
+
+class RedisCacheBackend:
+    """Redis-backed cache; eviction is delegated to Redis maxmemory LRU."""
+
+    def __init__(self, redis_url: str | None = None):
+        settings = get_settings()
+        self._redis = aioredis.from_url(
+            redis_url or str(settings.redis_url),
+            decode_responses=True,
+        )
+
+    async def get(self, key: str) -> str | None:
+        return await self._redis.get(key)
+
+    async def set(self, key: str, value: str, ttl_seconds: int) -> None:
+        await self._redis.setex(key, ttl_seconds, value)
+
+
+class LLMCache:
+    """Exact-match response cache for deterministic chat completions."""
+
+    def __init__(
+        self,
+        backend: CacheBackend | None = None,
+        ttl_seconds: int = DEFAULT_TTL_SECONDS,
+    ):
+        self._backend = backend or RedisCacheBackend()
+        self._ttl_seconds = ttl_seconds
+        self.stats: dict[str, int] = {"hits": 0, "misses": 0}
+
+    def cache_key(
+        self,
+        model: str,
+        messages: list[LLMMessage],
+        temperature: float,
+        tools: list[dict[str, Any]] | None = None,
+        response_format: dict[str, Any] | None = None,
+    ) -> str | None:
+        """Build a deterministic cache key, or None if the call is not cacheable."""
+        if temperature > MAX_CACHEABLE_TEMPERATURE:
+            return None
+
+        canonical = json.dumps(
+            {
+                "model": model,
+                "messages": [m.model_dump(exclude_none=True) for m in messages],
+                "tools": tools,
+                "response_format": response_format,
+            },
+            sort_keys=True,
+        )
+        return f"llm_cache:{hashlib.sha256(canonical.encode()).hexdigest()}"
+
+    async def get(self, key: str) -> LLMResponse | None:
+        """Look up a cached response; failures count as misses."""
+        try:
+            cached = await self._backend.get(key)
+        except Exception as e:
+            logger.warning(f"LLM cache get failed: {e}")
+            cached = None
+
+        if cached is None:
+            self.stats["misses"] += 1
+            return None
+
+        self.stats["hits"] += 1
+        return LLMResponse(**json.loads(cached))
+
+    async def set(self, key: str, response: LLMResponse) -> None:
+        """Store a successful response; failures are logged and ignored."""
+        try:
+            await self._backend.set(key, response.model_dump_json(), self._ttl_seconds)
+        except Exception as e:
+            logger.warning(f"LLM cache set failed: {e}")
+
+
+# Singleton instance
+_cache: LLMCache | None = None
+
+
+def get_llm_cache() -> LLMCache:
+    """Get the global LLM cache instance."""
+    global _cache
+    if _cache is None:
+        _cache = LLMCache()
+    return _cache
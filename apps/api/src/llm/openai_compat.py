@@ -0,0 +1,222 @@
+"""Shared adapter for OpenAI-compatible chat-completion providers.
+
+DeepSeek and Kimi/Moonshot expose byte-identical /chat/completions APIs;
+keeping the transport logic in one class means every optimization (HTTP/2,
+orjson bodies, wire-struct decoding, per-phase timeouts, cached health
+probes) applies to all providers and cannot drift between them.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import time
+from typing import Any, AsyncIterator
+
+import httpx
+import orjson
+
+from src.config import get_settings
+from src.schemas import LLMMessage, LLMResponse
+from src.llm.base import CLIENT_LIMITS, WIRE_DECODER, LLMAdapter, WireChoice
+
+
+# Statuses where a retry or another provider could plausibly succeed.
+# Plain 4xx (bad request, invalid schema) would fail identically anywhere.
+RETRYABLE_STATUSES = frozenset({408, 429, 500, 502, 503, 504})
+
+
+class OpenAICompatibleAdapter(LLMAdapter):
+    """Adapter for any provider speaking the OpenAI chat-completion API."""
+
+    # Seconds a health probe result stays valid
+    HEALTH_CHECK_TTL = 10.0
+
+    def __init__(
+        self,
+        provider_name: str,
+        api_key: str,
+        base_url: str,
+        default_model: str,
+        available_models: list[str],
+        read_timeout: float | None = None,
+        client: httpx.AsyncClient | None = None,
+    ):
+        settings = get_settings()
+        self._provider_name = provider_name
+        self.api_key = api_key
+        self.base_url = base_url
+        self.default_model = default_model
+        self._available_models = available_models
+
+        # Per-phase budgets: connect/write/pool fail fast on a dead or
+        # saturated backend; only the read phase spans token generation
+        self.timeout = httpx.Timeout(
+            connect=settings.llm_connect_timeout,
+            read=read_timeout if read_timeout is not None else settings.llm_read_timeout,
+            write=settings.llm_write_timeout,
+            pool=settings.llm_pool_timeout,
+        )
+
+        # Shared health-probe state: concurrent callers within the TTL
+        # window reuse one result instead of overlapping probes
+        self._hc_lock = asyncio.Lock()
+        self._hc_last_time = 0.0
+        self._hc_last_ok = False
+
+        if not self.api_key:
+            raise ValueError(f"{provider_name} API key not configured")
+
+        # An injected client (see router.py's shared pool) is reused across
+        # adapters and closed by its owner, not here
+        self._owns_client = client is None
+        self._client = client or httpx.AsyncClient(
+            base_url=self.base_url,
+            headers={
+                "Authorization": f"Bearer {self.api_key}",
+                "Content-Type": "application/json",
+            },
+            timeout=self.timeout,
+            http2=True,
+            limits=CLIENT_LIMITS,
+        )
+
+    @property
+    def provider_name(self) -> str:
+        return self._provider_name
+
+    @property
+    def available_models(self) -> list[str]:
+        return list(self._available_models)
+
+    async def chat_completion(
+        self,
+        messages: list[LLMMessage],
+        model: str | None = None,
+        temperature: float = 0.7,
+        max_tokens: int = 4096,
+        tools: list[dict[str, Any]] | None = None,
+        response_format: dict[str, Any] | None = None,
+    ) -> LLMResponse:
+        """Send a chat completion request to the provider."""
+        model = model or self.default_model
+
+        payload = self._build_request(
+            messages=messages,
+            model=model,
+            temperature=temperature,
+            max_tokens=max_tokens,
+            tools=tools,
+            response_format=response_format,
+        )
+
+        start_time = time.monotonic_ns()
+
+        try:
+            # orjson + raw bytes: the client's default Content-Type header
+            # already says application/json, and stdlib json is the dominant
+            # CPU cost on long completions
+            response = await self._client.post(
+                "/chat/completions", content=orjson.dumps(payload)
+            )
+            response.raise_for_status()
+            # Targeted decode: only the fields we return below are
+            # materialized, not the whole response DOM
+            data = WIRE_DECODER.decode(response.content)
+        except httpx.HTTPStatusError as e:
+            return LLMResponse.model_construct(
+                content=None,
+                model=model,
+                usage={},
+                finish_reason="error",
+                retryable=e.response.status_code in RETRYABLE_STATUSES,
+                raw_response={"error": str(e), "status_code": e.response.status_code},
+            )
+        except Exception as e:
+            # Transport-level failure (timeout, connect error): the request
+            # never reached a verdict, so retrying elsewhere can help
+            return LLMResponse.model_construct(
+                content=None,
+                model=model,
+                usage={},
+                finish_reason="error",
+                retryable=True,
+                raw_response={"error": str(e)},
+            )
+
+        latency_ms = (time.monotonic_ns() - start_time) // 1_000_000
+
+        # Parse response. raw_response stays unset on success: holding the
+        # full body alive per call costs memory without a reader
+        choice = data.choices[0] if data.choices else WireChoice()
+
+        return LLMResponse.model_construct(
+            content=choice.message.content,
+            tool_calls=choice.message.tool_calls,
+            model=data.model or model,
+            usage=data.usage,
+            finish_reason=choice.finish_reason,
+            latency_ms=latency_ms,
+        )
+
+    async def stream_chat_completion(
+        self,
+        messages: list[LLMMessage],
+        model: str | None = None,
+        temperature: float = 0.7,
+        max_tokens: int = 4096,
+        tools: list[dict[str, Any]] | None = None,
+        response_format: dict[str, Any] | None = None,
+    ) -> AsyncIterator[dict[str, Any]]:
+        """Stream chat completion chunks from the provider (SSE)."""
+        model = model or self.default_model
+
+        payload = self._build_request(
+            messages=messages,
+            model=model,
+            temperature=temperature,
+            max_tokens=max_tokens,
+            tools=tools,
+            response_format=response_format,
+        )
+        payload["stream"] = True
+
+        async with self._client.stream(
+            "POST", "/chat/completions", content=orjson.dumps(payload)
+        ) as response:
+            response.raise_for_status()
+            async for line in response.aiter_lines():
+                if not line.startswith("data: "):
+                    continue
+                data = line[len("data: "):]
+                if data == "[DONE]":
+                    break
+                try:
+                    yield orjson.loads(data)
+                except orjson.JSONDecodeError:
+                    continue
+
+    async def health_check(self) -> bool:
+        """Check if the provider API is accessible.
+
+        GET /models is free (no token billing, no rate-limit weight) and the
+        result is cached for HEALTH_CHECK_TTL seconds, so a burst of callers
+        shares a single probe.
+        """
+        if time.monotonic() - self._hc_last_time < self.HEALTH_CHECK_TTL:
+            return self._hc_last_ok
+        async with self._hc_lock:
+            # Re-check under the lock: another caller may have just probed
+            if time.monotonic() - self._hc_last_time < self.HEALTH_CHECK_TTL:
+                return self._hc_last_ok
+            try:
+                response = await self._client.get("/models")
+                self._hc_last_ok = 200 <= response.status_code < 300
+            except Exception:
+                self._hc_last_ok = False
+            self._hc_last_time = time.monotonic()
+            return self._hc_last_ok
+
+    async def close(self) -> None:
+        """Close the HTTP client if this adapter owns it."""
+        if self._owns_client:
+            await self._client.aclose()
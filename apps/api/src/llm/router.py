@@ -8,29 +8,128 @@ Strategy:
 
 from __future__ import annotations
 
+import asyncio
 import logging
+import random
+import time
 from typing import Any, Literal
 
+import httpx
+
 from src.config import get_settings
 from src.schemas import LLMMessage, LLMResponse, StepName
-from src.llm.base import LLMAdapter
+from src.llm.base import CLIENT_LIMITS, LLMAdapter
+from src.llm.cache import get_llm_cache
 from src.llm.deepseek import DeepSeekAdapter
 from src.llm.kimi import KimiAdapter
+from src.llm.openai_compat import RETRYABLE_STATUSES
 
 
 logger = logging.getLogger(__name__)
 
 
+# Retry/breaker tuning. Retries cover transient failures (429, 5xx,
+# transport errors); the breaker stops hammering a provider that keeps
+# failing and lets calls fail fast to the fallback instead of queueing
+# behind full timeouts.
+MAX_ATTEMPTS = 3
+RETRY_BASE_DELAY = 0.5
+RETRY_JITTER = 0.25
+BREAKER_FAILURE_THRESHOLD = 5
+BREAKER_WINDOW_SECONDS = 30.0
+BREAKER_COOLDOWN_SECONDS = 30.0
+
+class _BreakerState:
+    """Per-provider failure tracking for the circuit breaker."""
+
+    __slots__ = ("failures", "window_start", "opened_at", "cooldown")
+
+    def __init__(self) -> None:
+        self.failures = 0
+        self.window_start = 0.0
+        self.opened_at: float | None = None
+        self.cooldown = BREAKER_COOLDOWN_SECONDS
+
+
+# One pooled HTTP client per (base_url, api_key), shared across adapter
+# instances so re-instantiations (workers, tests) reuse warm keepalive
+# connections instead of opening fresh sockets
+_shared_clients: dict[tuple[str, str], httpx.AsyncClient] = {}
+
+
+def _shared_client(base_url: str, api_key: str) -> httpx.AsyncClient:
+    """Get or create the pooled client for a provider endpoint."""
+    key = (base_url, api_key)
+    client = _shared_clients.get(key)
+    if client is None or client.is_closed:
+        settings = get_settings()
+        client = httpx.AsyncClient(
+            base_url=base_url,
+            headers={
+                "Authorization": f"Bearer {api_key}",
+                "Content-Type": "application/json",
+            },
+            timeout=httpx.Timeout(
+                connect=settings.llm_connect_timeout,
+                read=settings.llm_read_timeout,
+                write=settings.llm_write_timeout,
+                pool=settings.llm_pool_timeout,
+            ),
+            http2=True,
+            limits=CLIENT_LIMITS,
+        )
+        _shared_clients[key] = client
+    return client
+
+
+def _json_prefix_valid(text: str) -> bool:
+    """Check whether text is a prefix of a syntactically valid JSON object.
+
+    Used while streaming JSON-mode responses: as soon as the accumulated
+    content can no longer become valid JSON we abort the stream instead of
+    paying for the remaining tokens.
+    """
+    stripped = text.lstrip()
+    if not stripped:
+        return True
+    if stripped[0] != "{":
+        return False
+
+    depth = 0
+    in_string = False
+    escaped = False
+    for i, ch in enumerate(stripped):
+        if in_string:
+            if escaped:
+                escaped = False
+            elif ch == "\\":
+                escaped = True
+            elif ch == '"':
+                in_string = False
+        elif ch == '"':
+            in_string = True
+        elif ch in "{[":
+            depth += 1
+        elif ch in "}]":
+            depth -= 1
+            if depth < 0:
+                return False
+            if depth == 0 and stripped[i + 1:].strip():
+                # Trailing garbage after the closing brace
+                return False
+    return True
+
+
 class ModelRouter:
     """Routes LLM requests to appropriate providers with fallback logic."""
     
     # Step-to-model mapping (what model should be used for each step)
     STEP_MODEL_MAP: dict[str, str] = {
-        StepName.PLAN.value: "fast",       # Use fast model for planning
+        StepName.PLAN.value: "small",      # Planning is a lightweight transformation
         StepName.CHECKLIST.value: "fast",  # Use fast model for checklist
         StepName.EXECUTE.value: "reasoning",  # Use reasoning for code
         StepName.VALIDATE.value: "fast",   # Use fast for validation
-        StepName.SUMMARY.value: "fast",    # Use fast for summary
+        StepName.SUMMARY.value: "small",   # Summarization needs the least capability
     }
     
     def __init__(self):
@@ -41,53 +140,173 @@ class ModelRouter:
         # Initialize adapters lazily
         self._adapters: dict[str, LLMAdapter] = {}
         self._settings = settings
+
+        self._breakers: dict[str, _BreakerState] = {
+            "deepseek": _BreakerState(),
+            "kimi": _BreakerState(),
+        }
+
+        # Per-provider concurrency bound; batch fan-out acquires these so a
+        # burst of EXECUTE calls multiplexes over HTTP/2 without swamping a
+        # provider's rate limits
+        self._semaphores: dict[str, asyncio.Semaphore] = {
+            "deepseek": asyncio.Semaphore(settings.llm_max_concurrency_per_provider),
+            "kimi": asyncio.Semaphore(settings.llm_max_concurrency_per_provider),
+        }
+
+        # (provider, model_type) -> (provider, model), resolved once so the
+        # per-call path is a single dict lookup instead of branching and
+        # settings attribute chains
+        self._resolved: dict[tuple[str, str], tuple[str, str]] = {
+            # "small" and "fast" both map to the chat model on DeepSeek
+            ("deepseek", "small"): ("deepseek", settings.deepseek_model_chat),
+            ("deepseek", "fast"): ("deepseek", settings.deepseek_model_chat),
+            ("deepseek", "reasoning"): ("deepseek", settings.deepseek_model_reasoner),
+            ("kimi", "small"): ("kimi", settings.kimi_model_small),
+            ("kimi", "fast"): ("kimi", settings.kimi_model),
+            ("kimi", "reasoning"): ("kimi", settings.kimi_model),
+        }
     
     def _get_adapter(self, provider: str) -> LLMAdapter:
-        """Get or create an adapter for a provider."""
+        """Get or create an adapter for a provider, on a shared HTTP client."""
         if provider not in self._adapters:
             if provider == "deepseek":
-                self._adapters["deepseek"] = DeepSeekAdapter()
+                client = None
+                if self._settings.deepseek_api_key:
+                    client = _shared_client(
+                        self._settings.deepseek_base_url,
+                        self._settings.deepseek_api_key,
+                    )
+                self._adapters["deepseek"] = DeepSeekAdapter(client=client)
             elif provider == "kimi":
-                self._adapters["kimi"] = KimiAdapter()
+                client = None
+                if self._settings.kimi_api_key:
+                    client = _shared_client(
+                        self._settings.kimi_base_url,
+                        self._settings.kimi_api_key,
+                    )
+                self._adapters["kimi"] = KimiAdapter(client=client)
             else:
                 raise ValueError(f"Unknown provider: {provider}")
         return self._adapters[provider]
     
     def _get_model_for_step(
         self,
-        step: str,
-        model_type: Literal["fast", "reasoning"] | None = None,
+        step: StepName | str,
+        model_type: Literal["small", "fast", "reasoning"] | None = None,
     ) -> tuple[str, str]:
         """Get provider and model name for a step.
         
         Returns:
             Tuple of (provider, model_name)
         """
-        # Determine model type from step if not specified
+        # Determine model type from step if not specified. Normalize the
+        # step to its string value once; callers can pass the enum directly
+        # without a .value at every call site.
         if model_type is None:
+            if isinstance(step, StepName):
+                step = step.value
             model_type = self.STEP_MODEL_MAP.get(step, "fast")
-        
-        # Get model based on primary provider
-        if self.primary_provider == "deepseek":
-            if model_type == "reasoning":
-                return ("deepseek", self._settings.deepseek_model_reasoner)
-            return ("deepseek", self._settings.deepseek_model_chat)
-        else:  # kimi
-            return ("kimi", self._settings.kimi_model)
+
+        return self._resolved[(self.primary_provider, model_type)]
     
+    def _breaker_open(self, provider: str) -> bool:
+        """Check (and age) the provider's breaker; True means fail fast."""
+        state = self._breakers[provider]
+        if state.opened_at is None:
+            return False
+        if time.monotonic() - state.opened_at >= state.cooldown:
+            # Half-open: let one call probe; a single failure re-opens
+            state.opened_at = None
+            state.failures = BREAKER_FAILURE_THRESHOLD - 1
+            return False
+        return True
+
+    def _record_failure(self, provider: str) -> None:
+        state = self._breakers[provider]
+        now = time.monotonic()
+        if now - state.window_start > BREAKER_WINDOW_SECONDS:
+            state.window_start = now
+            state.failures = 0
+        state.failures += 1
+        if state.failures >= BREAKER_FAILURE_THRESHOLD:
+            # Jittered cooldown so a fleet of workers does not re-probe in
+            # lockstep when it expires
+            state.cooldown = BREAKER_COOLDOWN_SECONDS * (0.8 + 0.4 * random.random())
+            state.opened_at = now
+            logger.warning(
+                f"Circuit opened for {provider} "
+                f"({state.failures} failures, cooldown {state.cooldown:.1f}s)"
+            )
+
+    def _record_success(self, provider: str) -> None:
+        state = self._breakers[provider]
+        state.failures = 0
+        state.opened_at = None
+
+    async def _call_with_retries(
+        self,
+        provider: str,
+        adapter: LLMAdapter,
+        messages: list[LLMMessage],
+        model: str,
+        temperature: float,
+        max_tokens: int,
+        tools: list[dict[str, Any]] | None,
+        response_format: dict[str, Any] | None,
+        stream: bool,
+    ) -> LLMResponse:
+        """Call one provider with bounded, jittered retries on transient errors.
+
+        Every adapter call runs inside the provider's semaphore (bulkhead):
+        a slow or degraded provider can saturate at most its own permit pool
+        and cannot starve calls routed to the other provider. The permit is
+        released during retry backoff so waiting callers can proceed.
+        """
+        response: LLMResponse | None = None
+        for attempt in range(MAX_ATTEMPTS):
+            if attempt:
+                delay = RETRY_BASE_DELAY * 2 ** (attempt - 1) + random.uniform(0, RETRY_JITTER)
+                logger.warning(f"Retrying {model} after {delay:.2f}s (attempt {attempt + 1})")
+                await asyncio.sleep(delay)
+            async with self._semaphores[provider]:
+                if stream:
+                    response = await self._stream_completion(
+                        adapter=adapter,
+                        messages=messages,
+                        model=model,
+                        temperature=temperature,
+                        max_tokens=max_tokens,
+                        tools=tools,
+                        response_format=response_format,
+                    )
+                else:
+                    response = await adapter.chat_completion(
+                        messages=messages,
+                        model=model,
+                        temperature=temperature,
+                        max_tokens=max_tokens,
+                        tools=tools,
+                        response_format=response_format,
+                    )
+            if response.finish_reason != "error" or not response.retryable:
+                break
+        return response
+
     async def chat_completion(
         self,
         messages: list[LLMMessage],
-        step: str = "EXECUTE",
-        model_type: Literal["fast", "reasoning"] | None = None,
+        step: StepName | str = StepName.EXECUTE,
+        model_type: Literal["small", "fast", "reasoning"] | None = None,
         temperature: float = 0.7,
         max_tokens: int = 4096,
         tools: list[dict[str, Any]] | None = None,
-        response_format: dict[str, str] | None = None,
+        response_format: dict[str, Any] | None = None,
         allow_fallback: bool = True,
+        stream: bool = False,
     ) -> tuple[LLMResponse, str, str]:
         """Route a chat completion request with fallback.
-        
+
         Args:
             messages: Conversation messages
             step: Current workflow step
@@ -97,42 +316,94 @@ class ModelRouter:
             tools: Tool definitions
             response_format: Response format config
             allow_fallback: Whether to try fallback on failure
-            
+            stream: Stream the response and abort early on malformed JSON
+
         Returns:
             Tuple of (response, provider_used, model_used)
         """
         provider, model = self._get_model_for_step(step, model_type)
-        
+
         logger.info(f"Routing {step} to {provider}/{model}")
-        
+
+        # Exact-match cache for deterministic (low-temperature) calls
+        cache = get_llm_cache()
+        cache_key = cache.cache_key(
+            model=model,
+            messages=messages,
+            temperature=temperature,
+            tools=tools,
+            response_format=response_format,
+        )
+        if cache_key:
+            cached_response = await cache.get(cache_key)
+            if cached_response is not None:
+                logger.info(
+                    f"LLM cache hit for {step} "
+                    f"(hits={cache.stats['hits']}, misses={cache.stats['misses']})"
+                )
+                return (cached_response, provider, model)
+
+        # Open breaker: skip the doomed primary call entirely
+        if allow_fallback and self._breaker_open(provider):
+            logger.warning(f"Circuit open for {provider}, failing fast to fallback")
+            return await self._try_fallback(
+                messages=messages,
+                step=step,
+                model_type=model_type,
+                temperature=temperature,
+                max_tokens=max_tokens,
+                tools=tools,
+                response_format=response_format,
+            )
+
         try:
             adapter = self._get_adapter(provider)
-            response = await adapter.chat_completion(
+            response = await self._call_with_retries(
+                provider=provider,
+                adapter=adapter,
                 messages=messages,
                 model=model,
                 temperature=temperature,
                 max_tokens=max_tokens,
                 tools=tools,
                 response_format=response_format,
+                stream=stream,
             )
-            
-            # Check if request failed
-            if response.finish_reason == "error" and allow_fallback:
-                logger.warning(f"Primary provider {provider} failed, trying fallback")
-                return await self._try_fallback(
-                    messages=messages,
-                    step=step,
-                    model_type=model_type,
-                    temperature=temperature,
-                    max_tokens=max_tokens,
-                    tools=tools,
-                    response_format=response_format,
-                )
-            
+
+            # Check if request failed. Non-retryable client errors (4xx
+            # other than 408/429) would fail identically on the fallback,
+            # so they return immediately and don't count against the
+            # provider's breaker.
+            if response.finish_reason == "error":
+                if not response.retryable:
+                    logger.warning(
+                        f"Primary provider {provider} returned non-retryable error; "
+                        "skipping fallback"
+                    )
+                    return (response, provider, model)
+                self._record_failure(provider)
+                if allow_fallback:
+                    logger.warning(f"Primary provider {provider} failed, trying fallback")
+                    return await self._try_fallback(
+                        messages=messages,
+                        step=step,
+                        model_type=model_type,
+                        temperature=temperature,
+                        max_tokens=max_tokens,
+                        tools=tools,
+                        response_format=response_format,
+                    )
+            else:
+                self._record_success(provider)
+
+            if cache_key and response.finish_reason != "error":
+                await cache.set(cache_key, response)
+
             return (response, provider, model)
-            
+
         except Exception as e:
             logger.error(f"Error with {provider}: {e}")
+            self._record_failure(provider)
             if allow_fallback:
                 return await self._try_fallback(
                     messages=messages,
@@ -145,46 +416,151 @@ class ModelRouter:
                 )
             raise
     
+    async def chat_completion_batch(
+        self,
+        requests: list[dict[str, Any]],
+    ) -> list[tuple[LLMResponse, str, str]]:
+        """Issue many chat completions concurrently.
+
+        Each entry is a kwargs dict for :meth:`chat_completion` (messages
+        plus any of step/model_type/temperature/...). Calls run under
+        asyncio.gather so N independent completions (e.g. parallel EXECUTE
+        items) multiplex over the pooled HTTP/2 connections instead of
+        running serially; the per-provider semaphore inside
+        :meth:`_call_with_retries` bounds the fan-out.
+        """
+        return list(
+            await asyncio.gather(*(self.chat_completion(**r) for r in requests))
+        )
+
+    async def _stream_completion(
+        self,
+        adapter: LLMAdapter,
+        messages: list[LLMMessage],
+        model: str,
+        temperature: float,
+        max_tokens: int,
+        tools: list[dict[str, Any]] | None,
+        response_format: dict[str, Any] | None,
+    ) -> LLMResponse:
+        """Consume a streaming completion, validating JSON incrementally.
+
+        For JSON-mode calls the accumulated content is checked chunk by
+        chunk; once it can no longer become a valid JSON object the stream
+        is aborted, saving the remaining output tokens. Time-to-first-token
+        is also surfaced immediately in logs rather than after full decode.
+        """
+        expect_json = bool(
+            response_format and response_format.get("type") in ("json_object", "json_schema")
+        )
+
+        parts: list[str] = []
+        finish_reason: str | None = None
+        usage: dict[str, int] = {}
+
+        try:
+            async for chunk in adapter.stream_chat_completion(
+                messages=messages,
+                model=model,
+                temperature=temperature,
+                max_tokens=max_tokens,
+                tools=tools,
+                response_format=response_format,
+            ):
+                choice = chunk.get("choices", [{}])[0]
+                delta = choice.get("delta", {}).get("content")
+                if delta:
+                    parts.append(delta)
+                    if expect_json and not _json_prefix_valid("".join(parts)):
+                        logger.warning("Aborting stream: content cannot become valid JSON")
+                        return LLMResponse.model_construct(
+                            content=None,
+                            model=model,
+                            usage=usage,
+                            finish_reason="error",
+                            raw_response={"error": "malformed JSON stream", "partial": "".join(parts)},
+                        )
+                if choice.get("finish_reason"):
+                    finish_reason = choice["finish_reason"]
+                if chunk.get("usage"):
+                    usage = chunk["usage"]
+        except httpx.HTTPStatusError as e:
+            # raise_for_status fires inside the stream context; classify the
+            # status the same way the non-streaming path does so retries and
+            # the fallback provider still apply to streamed EXECUTE calls
+            return LLMResponse.model_construct(
+                content=None,
+                model=model,
+                usage=usage,
+                finish_reason="error",
+                retryable=e.response.status_code in RETRYABLE_STATUSES,
+                raw_response={"error": str(e), "status_code": e.response.status_code},
+            )
+        except Exception as e:
+            # Transport-level failure mid-stream: no verdict was reached,
+            # so another attempt or provider can succeed
+            return LLMResponse.model_construct(
+                content=None,
+                model=model,
+                usage=usage,
+                finish_reason="error",
+                retryable=True,
+                raw_response={"error": str(e)},
+            )
+
+        return LLMResponse.model_construct(
+            content="".join(parts) or None,
+            model=model,
+            usage=usage,
+            finish_reason=finish_reason,
+        )
+
     async def _try_fallback(
         self,
         messages: list[LLMMessage],
-        step: str,
-        model_type: Literal["fast", "reasoning"] | None,
+        step: StepName | str,
+        model_type: Literal["small", "fast", "reasoning"] | None,
         temperature: float,
         max_tokens: int,
         tools: list[dict[str, Any]] | None,
-        response_format: dict[str, str] | None,
+        response_format: dict[str, Any] | None,
     ) -> tuple[LLMResponse, str, str]:
         """Try the fallback provider."""
         fallback_provider = self.fallback_provider
-        
-        # Get model for fallback provider
-        if fallback_provider == "deepseek":
-            if model_type == "reasoning":
-                model = self._settings.deepseek_model_reasoner
-            else:
-                model = self._settings.deepseek_model_chat
-        else:
-            model = self._settings.kimi_model
-        
+        _, model = self._resolved[(fallback_provider, model_type or "fast")]
+
         logger.info(f"Falling back to {fallback_provider}/{model}")
         
         adapter = self._get_adapter(fallback_provider)
-        response = await adapter.chat_completion(
+        response = await self._call_with_retries(
+            provider=fallback_provider,
+            adapter=adapter,
             messages=messages,
             model=model,
             temperature=temperature,
             max_tokens=max_tokens,
             tools=tools,
             response_format=response_format,
+            stream=False,
         )
-        
+
+        # Track fallback health too, so its breaker state is accurate if
+        # providers are ever swapped — but never fail fast here: the
+        # fallback is the last resort
+        if response.finish_reason == "error":
+            self._record_failure(fallback_provider)
+        else:
+            self._record_success(fallback_provider)
+
         return (response, fallback_provider, model)
     
     async def close(self) -> None:
-        """Close all adapters."""
+        """Close all adapters, then the shared clients (exactly once)."""
         for adapter in self._adapters.values():
             await adapter.close()
+        while _shared_clients:
+            _, client = _shared_clients.popitem()
+            await client.aclose()
 
 
 # Singleton instance
@@ -9,8 +9,10 @@ These schemas define the strict contracts between:
 
 from __future__ import annotations
 
-from datetime import datetime
+import secrets
+from datetime import datetime, timezone
 from enum import Enum
+from functools import cached_property
 from typing import Any, Literal
 from uuid import UUID, uuid4
 
@@ -78,6 +80,10 @@ class FeatureRequest(BaseModel):
     repo_path: str = Field(..., description="Local path to the repository")
     base_branch: str = Field(default="main", description="Branch to base changes on")
     model_profile: str = Field(default="default", description="Model routing profile to use")
+    require_approval: bool = Field(
+        default=False,
+        description="Pause for human review of the checklist before executing changes",
+    )
     
     class Config:
         json_schema_extra = {
@@ -90,11 +96,31 @@ class FeatureRequest(BaseModel):
         }
 
 
+# =============================================================================
+# Trusted rehydration
+# =============================================================================
+
+class _TrustedModel(BaseModel):
+    """Base for models that are rehydrated from our own serialized output.
+
+    ``from_trusted`` skips pydantic validation via ``model_construct`` — safe
+    only for payloads this service wrote itself (Redis caches, DB rows), where
+    the data already passed validation on the way in. LLM output must keep
+    going through ``model_validate_json``. Subclasses with enum or nested
+    model fields override this to restore those types, since
+    ``model_construct`` does no coercion.
+    """
+
+    @classmethod
+    def from_trusted(cls, data: dict[str, Any]):
+        return cls.model_construct(**data)
+
+
 # =============================================================================
 # Plan Schemas
 # =============================================================================
 
-class Plan(BaseModel):
+class Plan(_TrustedModel):
     """Output from plan_node - high-level implementation plan."""
     title: str = Field(..., description="Short title for the plan")
     problem_statement: str = Field(..., description="Clear description of what needs to be done")
@@ -105,55 +131,93 @@ class Plan(BaseModel):
     
     def to_markdown(self) -> str:
         """Render plan as markdown."""
-        md = f"# {self.title}\n\n"
-        md += f"## Problem Statement\n{self.problem_statement}\n\n"
-        md += f"## Proposed Approach\n{self.proposed_approach}\n\n"
-        md += f"## Affected Files\n"
+        # Accumulate in a list: repeated str += is quadratic on long lists
+        parts = [
+            f"# {self.title}\n\n",
+            f"## Problem Statement\n{self.problem_statement}\n\n",
+            f"## Proposed Approach\n{self.proposed_approach}\n\n",
+            "## Affected Files\n",
+        ]
         for f in self.affected_files:
-            md += f"- `{f}`\n"
-        md += f"\n## Estimated Complexity\n{self.estimated_complexity.value}\n"
+            parts.append(f"- `{f}`\n")
+        parts.append(f"\n## Estimated Complexity\n{self.estimated_complexity.value}\n")
         if self.risks:
-            md += f"\n## Risks\n"
+            parts.append("\n## Risks\n")
             for r in self.risks:
-                md += f"- {r}\n"
-        return md
+                parts.append(f"- {r}\n")
+        return "".join(parts)
+
+    @classmethod
+    def from_trusted(cls, data: dict[str, Any]) -> Plan:
+        return cls.model_construct(
+            **{
+                **data,
+                "estimated_complexity": Complexity(
+                    data.get("estimated_complexity", Complexity.MEDIUM)
+                ),
+            }
+        )
 
 
 # =============================================================================
 # Checklist Schemas
 # =============================================================================
 
-class ChecklistItem(BaseModel):
+class ChecklistItem(_TrustedModel):
     """Single actionable step in the checklist."""
-    id: str = Field(default_factory=lambda: str(uuid4())[:8])
+    # token_hex(4) gives the same 8-hex-char id as the old uuid4+slice,
+    # without building and formatting a full UUID per item
+    id: str = Field(default_factory=lambda: secrets.token_hex(4))
     description: str = Field(..., description="What needs to be done")
     file_path: str | None = Field(default=None, description="Target file for this step")
     action: ActionType = Field(..., description="Type of action")
     dependencies: list[str] = Field(default_factory=list, description="IDs of items this depends on")
     completed: bool = Field(default=False)
-    
 
-class Checklist(BaseModel):
+    @classmethod
+    def from_trusted(cls, data: dict[str, Any]) -> ChecklistItem:
+        return cls.model_construct(**{**data, "action": ActionType(data["action"])})
+
+
+
+class Checklist(_TrustedModel):
     """Output from checklist_node - ordered actionable steps."""
     items: list[ChecklistItem] = Field(..., description="Ordered list of steps")
     test_strategy: str = Field(..., description="How to verify the changes work")
     
     def to_markdown(self) -> str:
         """Render checklist as markdown."""
-        md = "# Implementation Checklist\n\n"
+        parts = ["# Implementation Checklist\n\n"]
         for i, item in enumerate(self.items, 1):
             checkbox = "[x]" if item.completed else "[ ]"
             file_str = f" (`{item.file_path}`)" if item.file_path else ""
-            md += f"{i}. {checkbox} **{item.action.value.upper()}**{file_str}: {item.description}\n"
-        md += f"\n## Test Strategy\n{self.test_strategy}\n"
-        return md
+            parts.append(
+                f"{i}. {checkbox} **{item.action.value.upper()}**{file_str}: {item.description}\n"
+            )
+        parts.append(f"\n## Test Strategy\n{self.test_strategy}\n")
+        return "".join(parts)
+
+    @classmethod
+    def from_trusted(cls, data: dict[str, Any]) -> Checklist:
+        items = [
+            ChecklistItem.from_trusted(i) if isinstance(i, dict) else i
+            for i in data.get("items", [])
+        ]
+        return cls.model_construct(**{**data, "items": items})
 
 
 # =============================================================================
 # Execution Schemas
 # =============================================================================
 
-class ExecutionPatch(BaseModel):
+class ExecutionResult(BaseModel):
+    """Structured output contract for the execute step LLM call."""
+    file_path: str = Field(..., description="Path to the file to write")
+    new_content: str = Field(..., description="Complete new file content")
+    explanation: str = Field(default="", description="Brief explanation of changes made")
+
+
+class ExecutionPatch(_TrustedModel):
     """A single file change produced during execution."""
     file_path: str = Field(..., description="Path to the file")
     original_content: str | None = Field(default=None, description="Original file content (None if new file)")
@@ -162,7 +226,7 @@ class ExecutionPatch(BaseModel):
     checklist_item_id: str | None = Field(default=None, description="Associated checklist item")
 
 
-class ValidationResult(BaseModel):
+class ValidationResult(_TrustedModel):
     """Result of validating a patch or execution."""
     passed: bool = Field(..., description="Whether validation passed")
     checks: dict[str, bool] = Field(default_factory=dict, description="Individual check results")
@@ -175,7 +239,7 @@ class ValidationResult(BaseModel):
 # Summary Schemas
 # =============================================================================
 
-class RunSummary(BaseModel):
+class RunSummary(_TrustedModel):
     """Output from summary_node - PR-ready summary."""
     title: str = Field(..., description="PR title")
     description: str = Field(..., description="PR description")
@@ -187,30 +251,34 @@ class RunSummary(BaseModel):
     
     def to_markdown(self) -> str:
         """Render summary as markdown."""
-        md = f"# {self.title}\n\n"
-        md += f"{self.description}\n\n"
-        md += "## Changes Made\n"
+        parts = [
+            f"# {self.title}\n\n",
+            f"{self.description}\n\n",
+            "## Changes Made\n",
+        ]
         for c in self.changes_made:
-            md += f"- {c}\n"
-        md += "\n## Files Changed\n"
+            parts.append(f"- {c}\n")
+        parts.append("\n## Files Changed\n")
         for f in self.files_changed:
-            md += f"- `{f}`\n"
-        md += f"\n## Tests\n{'✅ All tests passed' if self.tests_passed else '❌ Tests failed'}\n"
-        md += "\n## Verification Steps\n"
+            parts.append(f"- `{f}`\n")
+        parts.append(
+            f"\n## Tests\n{'✅ All tests passed' if self.tests_passed else '❌ Tests failed'}\n"
+        )
+        parts.append("\n## Verification Steps\n")
         for i, v in enumerate(self.verification_steps, 1):
-            md += f"{i}. {v}\n"
+            parts.append(f"{i}. {v}\n")
         if self.risk_notes:
-            md += "\n## Risk Notes\n"
+            parts.append("\n## Risk Notes\n")
             for r in self.risk_notes:
-                md += f"- ⚠️ {r}\n"
-        return md
+                parts.append(f"- ⚠️ {r}\n")
+        return "".join(parts)
 
 
 # =============================================================================
 # Tool Schemas
 # =============================================================================
 
-class ToolResult(BaseModel):
+class ToolResult(_TrustedModel):
     """Standard response from any tool call."""
     ok: bool = Field(..., description="Whether the tool call succeeded")
     data: Any | None = Field(default=None, description="Tool-specific response data")
@@ -226,7 +294,7 @@ class ToolCallLog(BaseModel):
     tool_name: str
     request: dict[str, Any]
     response: ToolResult
-    timestamp: datetime = Field(default_factory=datetime.utcnow)
+    timestamp: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
 
 
 # =============================================================================
@@ -275,12 +343,43 @@ class RunListResponse(BaseModel):
 # =============================================================================
 
 class LLMMessage(BaseModel):
-    """A single message in an LLM conversation."""
+    """A single message in an LLM conversation.
+
+    Frozen so shared instances (the system-message singleton) can be
+    reused across calls without their serialized form going stale.
+    """
+    model_config = {"frozen": True}
+
     role: Literal["system", "user", "assistant", "tool"] = Field(...)
     content: str = Field(...)
     name: str | None = Field(default=None, description="Name for tool messages")
     tool_calls: list[dict[str, Any]] | None = Field(default=None)
     tool_call_id: str | None = Field(default=None)
+    cache_control: dict[str, str] | None = Field(
+        default=None,
+        description=(
+            "Prompt-cache breakpoint hint (e.g. {'type': 'ephemeral'}). Translated "
+            "per-provider by adapters; a no-op for providers with automatic prefix caching."
+        ),
+    )
+
+    @cached_property
+    def as_payload(self) -> dict[str, Any]:
+        """Wire-format dict for OpenAI-compatible APIs.
+
+        Cached per instance (safe because the model is frozen), so retries
+        and fallback calls reuse the dict instead of re-dumping every
+        message in the history. ``cache_control`` is intentionally omitted;
+        see LLMAdapter._build_request.
+        """
+        payload: dict[str, Any] = {"role": self.role, "content": self.content}
+        if self.name is not None:
+            payload["name"] = self.name
+        if self.tool_calls is not None:
+            payload["tool_calls"] = self.tool_calls
+        if self.tool_call_id is not None:
+            payload["tool_call_id"] = self.tool_call_id
+        return payload
 
 
 class LLMRequest(BaseModel):
@@ -290,7 +389,7 @@ class LLMRequest(BaseModel):
     temperature: float = Field(default=0.7, ge=0.0, le=2.0)
     max_tokens: int = Field(default=4096, gt=0)
     tools: list[dict[str, Any]] | None = None
-    response_format: dict[str, str] | None = None
+    response_format: dict[str, Any] | None = None
 
 
 class LLMResponse(BaseModel):
@@ -300,6 +399,11 @@ class LLMResponse(BaseModel):
     model: str
     usage: dict[str, int] = Field(default_factory=dict)
     finish_reason: str | None = None
+    latency_ms: int | None = None
+    retryable: bool = Field(
+        default=False,
+        description="For error responses: whether another provider could plausibly succeed",
+    )
     raw_response: dict[str, Any] | None = None
 
 
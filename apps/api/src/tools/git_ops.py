@@ -5,56 +5,245 @@ Provides safe git operations within repositories:
 - git_create_branch: Create and checkout a new branch
 - git_commit: Stage and commit changes
 - git_diff: Get diff of changes
+
+When pygit2 (libgit2 bindings) is importable, operations run in-process
+against a cached Repository handle instead of forking a `git` child per
+call — fork+exec plus stdout parsing costs tens of milliseconds per
+invocation regardless of repo size, and dominates these tools' latency.
+The original subprocess implementations are kept as a fallback for
+environments without pygit2 and for the few cases libgit2 does not cover.
 """
 
 from __future__ import annotations
 
+import asyncio
 import subprocess
 import os
+import time
 from typing import Any
 
 from src.schemas import ToolResult
 
+try:
+    import pygit2
+except ImportError:  # Optional fast path; subprocess fallback below
+    pygit2 = None
+
+
+# Opened repositories keyed by path. A Repository handle keeps the object
+# database and index in-process, so repeated tool calls skip repo discovery.
+_repo_cache: dict[str, Any] = {}
+
+# Cap on concurrently spawned git children across all tool calls. A burst
+# of agent requests otherwise multiplies forks without bound and can hit
+# EAGAIN on process limits; the bound still leaves headroom for the
+# intentionally parallel status/diff pairs.
+_GIT_PROC_SEM = asyncio.Semaphore(max(4, (os.cpu_count() or 1) * 2))
+
+
+async def _run_git(
+    repo_path: str, *args: str, timeout: float = 10
+) -> tuple[str, str, int]:
+    """Run one git command without blocking the event loop.
+
+    Returns (stdout, stderr, returncode). Independent invocations can be
+    awaited under asyncio.gather so their fork+exec and I/O overlap.
+    """
+    async with _GIT_PROC_SEM:
+        proc = await asyncio.create_subprocess_exec(
+            "git",
+            *args,
+            cwd=repo_path,
+            stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.PIPE,
+        )
+        try:
+            stdout, stderr = await asyncio.wait_for(proc.communicate(), timeout=timeout)
+        except (asyncio.TimeoutError, TimeoutError):
+            proc.kill()
+            raise subprocess.TimeoutExpired(["git", *args], timeout)
+    return stdout.decode(), stderr.decode(), proc.returncode
+
+
+def _get_repo(repo_path: str):
+    repo = _repo_cache.get(repo_path)
+    if repo is None:
+        repo = pygit2.Repository(repo_path)
+        _repo_cache[repo_path] = repo
+    return repo
+
+
+def _drop_repo(repo_path: str) -> None:
+    """Evict a cached handle after an unexpected libgit2 error."""
+    _repo_cache.pop(repo_path, None)
+
+
+def _signature(repo):
+    """Committer identity: repo config if present, agent identity otherwise."""
+    try:
+        return repo.default_signature
+    except Exception:
+        return pygit2.Signature("DevFlow Agent", "agent@devflow.local")
+
+
+def _current_branch(repo) -> str:
+    if repo.head_is_unborn:
+        return ""
+    if repo.head_is_detached:
+        return str(repo.head.target)[:8]
+    return repo.head.shorthand
+
+
+def _status_pygit2(repo_path: str) -> dict[str, Any]:
+    repo = _get_repo(repo_path)
+    status = repo.status()
+
+    changes: dict[str, list[str]] = {
+        "modified": [],
+        "added": [],
+        "deleted": [],
+        "untracked": [],
+    }
+    dirty = False
+    for path, flags in status.items():
+        if flags & pygit2.GIT_STATUS_IGNORED:
+            continue
+        dirty = True
+        if flags & pygit2.GIT_STATUS_WT_NEW:
+            changes["untracked"].append(path)
+        elif flags & (pygit2.GIT_STATUS_WT_MODIFIED | pygit2.GIT_STATUS_INDEX_MODIFIED):
+            changes["modified"].append(path)
+        elif flags & pygit2.GIT_STATUS_INDEX_NEW:
+            changes["added"].append(path)
+        elif flags & (pygit2.GIT_STATUS_WT_DELETED | pygit2.GIT_STATUS_INDEX_DELETED):
+            changes["deleted"].append(path)
+
+    return {
+        "branch": _current_branch(repo),
+        "changes": changes,
+        "is_clean": not dirty,
+    }
+
+
+def _rev_parse_pygit2(repo_path: str, ref: str) -> dict[str, Any]:
+    repo = _get_repo(repo_path)
+    obj = repo.revparse_single(ref)
+    return {"ref": ref, "sha": str(obj.id)}
+
+
+def _create_branch_pygit2(repo_path: str, branch_name: str, checkout: bool) -> dict[str, Any]:
+    repo = _get_repo(repo_path)
+    commit = repo[repo.head.target]
+    ref = repo.branches.local.create(branch_name, commit)
+    if checkout:
+        repo.checkout(ref)
+    return {"branch": branch_name, "checked_out": checkout}
+
+
+def _commit_pygit2(repo_path: str, message: str, add_all: bool) -> dict[str, Any]:
+    repo = _get_repo(repo_path)
+    index = repo.index
+    if add_all:
+        index.add_all()
+        index.write()
+    tree = index.write_tree()
+    parents = [] if repo.head_is_unborn else [repo.head.target]
+
+    if parents and tree == repo[repo.head.target].tree_id:
+        return {"committed": False, "message": "Nothing to commit"}
+
+    sig = _signature(repo)
+    oid = repo.create_commit("HEAD", sig, sig, message, tree, parents)
+    return {"committed": True, "hash": str(oid)[:8], "message": message}
+
+
+def _diff_pygit2(repo_path: str, staged: bool) -> dict[str, Any]:
+    repo = _get_repo(repo_path)
+    if repo.head_is_unborn:
+        return {"diff": "", "stats": "", "has_changes": False}
+
+    if staged:
+        diff = repo.diff("HEAD", cached=True)
+    else:
+        diff = repo.diff()
+
+    patch_text = diff.patch or ""
+    stats = diff.stats.format(pygit2.GIT_DIFF_STATS_FULL, 80).strip()
+    return {
+        "diff": patch_text,
+        "stats": stats,
+        "has_changes": len(patch_text.strip()) > 0,
+    }
+
+
+def _log_pygit2(repo_path: str, max_commits: int) -> dict[str, Any]:
+    repo = _get_repo(repo_path)
+    commits: list[dict[str, Any]] = []
+    if not repo.head_is_unborn:
+        for commit in repo.walk(repo.head.target, pygit2.GIT_SORT_TIME):
+            commits.append({
+                "hash": str(commit.id)[:8],
+                "message": commit.message.strip().split("\n", 1)[0],
+                "author": commit.author.name,
+                "date": time.strftime(
+                    "%Y-%m-%d",
+                    time.gmtime(commit.commit_time + commit.commit_time_offset * 60),
+                ),
+            })
+            if len(commits) >= max_commits:
+                break
+    return {"commits": commits, "count": len(commits)}
+
 
 async def git_status(repo_path: str) -> ToolResult:
     """Get git status of the repository.
-    
+
     Args:
         repo_path: Path to the repository
-        
+
     Returns:
         ToolResult with status information
     """
-    import time
     start = time.perf_counter()
-    
+
     if not os.path.isdir(os.path.join(repo_path, ".git")):
         return ToolResult(
             ok=False,
             error_code="NOT_A_GIT_REPO",
             error_message="Directory is not a git repository",
         )
-    
+
+    if pygit2 is not None:
+        try:
+            data = await asyncio.to_thread(_status_pygit2, repo_path)
+            latency_ms = int((time.perf_counter() - start) * 1000)
+            return ToolResult(ok=True, data=data, latency_ms=latency_ms)
+        except Exception:
+            _drop_repo(repo_path)
+
+    return await _git_status_subprocess(repo_path, start)
+
+
+def _read_head_branch(repo_path: str) -> str:
+    """Current branch straight from .git/HEAD, no subprocess.
+
+    HEAD is a one-line plumbing file: 'ref: refs/heads/<branch>' on a
+    branch, a bare sha when detached (abbreviated like the log output).
+    """
+    with open(os.path.join(repo_path, ".git", "HEAD")) as f:
+        head = f.read().strip()
+    if head.startswith("ref: refs/heads/"):
+        return head[len("ref: refs/heads/"):]
+    return head[:8]
+
+
+async def _git_status_subprocess(repo_path: str, start: float) -> ToolResult:
     try:
-        # Get branch name
-        branch_result = subprocess.run(
-            ["git", "branch", "--show-current"],
-            cwd=repo_path,
-            capture_output=True,
-            text=True,
-            timeout=10,
-        )
-        current_branch = branch_result.stdout.strip()
-        
-        # Get status
-        status_result = subprocess.run(
-            ["git", "status", "--porcelain"],
-            cwd=repo_path,
-            capture_output=True,
-            text=True,
-            timeout=10,
-        )
-        
+        # Branch comes from the HEAD plumbing file; only the status scan
+        # still needs a git child
+        current_branch = _read_head_branch(repo_path)
+        status_out, _, _ = await _run_git(repo_path, "status", "--porcelain")
+
         # Parse status
         changes = {
             "modified": [],
@@ -62,13 +251,13 @@ async def git_status(repo_path: str) -> ToolResult:
             "deleted": [],
             "untracked": [],
         }
-        
-        for line in status_result.stdout.strip().split("\n"):
+
+        for line in status_out.strip().split("\n"):
             if not line:
                 continue
             code = line[:2]
             file_path = line[3:]
-            
+
             if code[0] == "M" or code[1] == "M":
                 changes["modified"].append(file_path)
             elif code[0] == "A":
@@ -77,19 +266,96 @@ async def git_status(repo_path: str) -> ToolResult:
                 changes["deleted"].append(file_path)
             elif code[0] == "?" and code[1] == "?":
                 changes["untracked"].append(file_path)
-        
+
         latency_ms = int((time.perf_counter() - start) * 1000)
-        
+
         return ToolResult(
             ok=True,
             data={
                 "branch": current_branch,
                 "changes": changes,
-                "is_clean": len(status_result.stdout.strip()) == 0,
+                "is_clean": len(status_out.strip()) == 0,
+            },
+            latency_ms=latency_ms,
+        )
+
+    except subprocess.TimeoutExpired:
+        return ToolResult(
+            ok=False,
+            error_code="GIT_TIMEOUT",
+            error_message="Git command timed out",
+            retryable=True,
+        )
+    except Exception as e:
+        return ToolResult(
+            ok=False,
+            error_code="GIT_ERROR",
+            error_message=str(e),
+            retryable=True,
+        )
+
+
+async def git_rev_parse(repo_path: str, ref: str = "HEAD") -> ToolResult:
+    """Resolve a git ref to its full commit sha.
+
+    Args:
+        repo_path: Path to the repository
+        ref: Ref to resolve (default HEAD)
+
+    Returns:
+        ToolResult with the resolved sha
+    """
+    start = time.perf_counter()
+
+    if not os.path.isdir(os.path.join(repo_path, ".git")):
+        return ToolResult(
+            ok=False,
+            error_code="NOT_A_GIT_REPO",
+            error_message="Directory is not a git repository",
+        )
+
+    if pygit2 is not None:
+        try:
+            data = _rev_parse_pygit2(repo_path, ref)
+            latency_ms = int((time.perf_counter() - start) * 1000)
+            return ToolResult(ok=True, data=data, latency_ms=latency_ms)
+        except KeyError:
+            return ToolResult(
+                ok=False,
+                error_code="GIT_REV_PARSE_FAILED",
+                error_message=f"Unknown ref: {ref}",
+            )
+        except Exception:
+            _drop_repo(repo_path)
+
+    try:
+        async with _GIT_PROC_SEM:
+            result = subprocess.run(
+                ["git", "rev-parse", ref],
+                cwd=repo_path,
+                capture_output=True,
+                text=True,
+                timeout=5,
+            )
+
+        if result.returncode != 0:
+            return ToolResult(
+                ok=False,
+                error_code="GIT_REV_PARSE_FAILED",
+                error_message=result.stderr.strip(),
+            )
+
+        latency_ms = int((time.perf_counter() - start) * 1000)
+
+        return ToolResult(
+            ok=True,
+            data={
+                "ref": ref,
+                "sha": result.stdout.strip(),
             },
             latency_ms=latency_ms,
         )
-        
+
     except subprocess.TimeoutExpired:
         return ToolResult(
             ok=False,
@@ -112,53 +378,63 @@ async def git_create_branch(
     checkout: bool = True,
 ) -> ToolResult:
     """Create a new git branch.
-    
+
     Args:
         repo_path: Path to the repository
         branch_name: Name of the branch to create
         checkout: Whether to checkout the new branch
-        
+
     Returns:
         ToolResult with branch information
     """
-    import time
     start = time.perf_counter()
-    
+
     if not os.path.isdir(os.path.join(repo_path, ".git")):
         return ToolResult(
             ok=False,
             error_code="NOT_A_GIT_REPO",
             error_message="Directory is not a git repository",
         )
-    
+
     # Sanitize branch name
     safe_name = branch_name.replace(" ", "-").replace("/", "-")
     if safe_name != branch_name:
         branch_name = safe_name
-    
+
+    if pygit2 is not None:
+        try:
+            data = await asyncio.to_thread(
+                _create_branch_pygit2, repo_path, branch_name, checkout
+            )
+            latency_ms = int((time.perf_counter() - start) * 1000)
+            return ToolResult(ok=True, data=data, latency_ms=latency_ms)
+        except Exception:
+            _drop_repo(repo_path)
+
     try:
         if checkout:
             cmd = ["git", "checkout", "-b", branch_name]
         else:
             cmd = ["git", "branch", branch_name]
-        
-        result = subprocess.run(
-            cmd,
-            cwd=repo_path,
-            capture_output=True,
-            text=True,
-            timeout=10,
-        )
-        
+
+        async with _GIT_PROC_SEM:
+            result = subprocess.run(
+                cmd,
+                cwd=repo_path,
+                capture_output=True,
+                text=True,
+                timeout=10,
+            )
+
         if result.returncode != 0:
             return ToolResult(
                 ok=False,
                 error_code="BRANCH_CREATE_FAILED",
                 error_message=result.stderr.strip(),
             )
-        
+
         latency_ms = int((time.perf_counter() - start) * 1000)
-        
+
         return ToolResult(
             ok=True,
             data={
@@ -167,7 +443,7 @@ async def git_create_branch(
             },
             latency_ms=latency_ms,
         )
-        
+
     except subprocess.TimeoutExpired:
         return ToolResult(
             ok=False,
@@ -190,52 +466,59 @@ async def git_commit(
     add_all: bool = True,
 ) -> ToolResult:
     """Stage and commit changes.
-    
+
     Args:
         repo_path: Path to the repository
         message: Commit message
         add_all: Whether to add all changes before committing
-        
+
     Returns:
         ToolResult with commit information
     """
-    import time
     start = time.perf_counter()
-    
+
     if not os.path.isdir(os.path.join(repo_path, ".git")):
         return ToolResult(
             ok=False,
             error_code="NOT_A_GIT_REPO",
             error_message="Directory is not a git repository",
         )
-    
+
+    if pygit2 is not None:
+        try:
+            data = await asyncio.to_thread(_commit_pygit2, repo_path, message, add_all)
+            latency_ms = int((time.perf_counter() - start) * 1000)
+            return ToolResult(ok=True, data=data, latency_ms=latency_ms)
+        except Exception:
+            _drop_repo(repo_path)
+
+    return await _git_commit_subprocess(repo_path, message, add_all, start)
+
+
+async def _git_commit_subprocess(
+    repo_path: str,
+    message: str,
+    add_all: bool,
+    start: float,
+) -> ToolResult:
     try:
-        # Stage changes
+        # One &&-chained invocation instead of three subprocess.run calls
+        # (add, commit, rev-parse): two fewer fork+exec roundtrips per
+        # commit. The message travels as a positional argument, never
+        # interpolated into the script.
+        script = 'git commit -m "$1" && git rev-parse HEAD'
         if add_all:
-            add_result = subprocess.run(
-                ["git", "add", "-A"],
+            script = "git add -A && " + script
+
+        async with _GIT_PROC_SEM:
+            commit_result = subprocess.run(
+                ["bash", "-c", script, "git-commit", message],
                 cwd=repo_path,
                 capture_output=True,
                 text=True,
-                timeout=10,
+                timeout=30,
             )
-            
-            if add_result.returncode != 0:
-                return ToolResult(
-                    ok=False,
-                    error_code="GIT_ADD_FAILED",
-                    error_message=add_result.stderr.strip(),
-                )
-        
-        # Commit
-        commit_result = subprocess.run(
-            ["git", "commit", "-m", message],
-            cwd=repo_path,
-            capture_output=True,
-            text=True,
-            timeout=30,
-        )
-        
+
         if commit_result.returncode != 0:
             # Check if there's nothing to commit
             if "nothing to commit" in commit_result.stdout:
@@ -251,19 +534,12 @@ async def git_commit(
                 error_code="GIT_COMMIT_FAILED",
                 error_message=commit_result.stderr.strip(),
             )
-        
-        # Get commit hash
-        hash_result = subprocess.run(
-            ["git", "rev-parse", "HEAD"],
-            cwd=repo_path,
-            capture_output=True,
-            text=True,
-            timeout=5,
-        )
-        commit_hash = hash_result.stdout.strip()[:8]
-        
+
+        # rev-parse output is the last stdout line
+        commit_hash = commit_result.stdout.strip().rsplit("\n", 1)[-1][:8]
+
         latency_ms = int((time.perf_counter() - start) * 1000)
-        
+
         return ToolResult(
             ok=True,
             data={
@@ -273,7 +549,7 @@ async def git_commit(
             },
             latency_ms=latency_ms,
         )
-        
+
     except subprocess.TimeoutExpired:
         return ToolResult(
             ok=False,
@@ -296,64 +572,69 @@ async def git_diff(
     file_path: str | None = None,
 ) -> ToolResult:
     """Get diff of changes in the repository.
-    
+
     Args:
         repo_path: Path to the repository
         staged: Whether to show staged changes only
         file_path: Optional specific file to diff
-        
+
     Returns:
         ToolResult with diff content
     """
-    import time
     start = time.perf_counter()
-    
+
     if not os.path.isdir(os.path.join(repo_path, ".git")):
         return ToolResult(
             ok=False,
             error_code="NOT_A_GIT_REPO",
             error_message="Directory is not a git repository",
         )
-    
+
+    # libgit2 diffs have no pathspec equivalent to `git diff -- <file>`;
+    # single-file diffs stay on the subprocess path
+    if pygit2 is not None and file_path is None:
+        try:
+            data = await asyncio.to_thread(_diff_pygit2, repo_path, staged)
+            latency_ms = int((time.perf_counter() - start) * 1000)
+            return ToolResult(ok=True, data=data, latency_ms=latency_ms)
+        except Exception:
+            _drop_repo(repo_path)
+
+    return await _git_diff_subprocess(repo_path, staged, file_path, start)
+
+
+async def _git_diff_subprocess(
+    repo_path: str,
+    staged: bool,
+    file_path: str | None,
+    start: float,
+) -> ToolResult:
     try:
-        cmd = ["git", "diff"]
+        args = ["diff"]
         if staged:
-            cmd.append("--staged")
+            args.append("--staged")
         if file_path:
-            cmd.append("--")
-            cmd.append(file_path)
-        
-        result = subprocess.run(
-            cmd,
-            cwd=repo_path,
-            capture_output=True,
-            text=True,
-            timeout=30,
-        )
-        
-        diff_content = result.stdout
-        
-        # Parse diff stats
-        stats_result = subprocess.run(
-            cmd + ["--stat"],
-            cwd=repo_path,
-            capture_output=True,
-            text=True,
-            timeout=10,
+            args.append("--")
+            args.append(file_path)
+
+        # Full diff and --stat read the same working tree; run both at once
+        (diff_content, _, _), (stats_out, _, _) = await asyncio.gather(
+            _run_git(repo_path, *args, timeout=30),
+            _run_git(repo_path, *args, "--stat", timeout=10),
         )
-        
+
         latency_ms = int((time.perf_counter() - start) * 1000)
-        
+
         return ToolResult(
             ok=True,
             data={
                 "diff": diff_content,
-                "stats": stats_result.stdout.strip(),
+                "stats": stats_out.strip(),
                 "has_changes": len(diff_content.strip()) > 0,
             },
             latency_ms=latency_ms,
         )
-        
+
     except subprocess.TimeoutExpired:
         return ToolResult(
             ok=False,
@@ -375,53 +656,59 @@ async def git_log(
     max_commits: int = 10,
 ) -> ToolResult:
     """Get recent git commits.
-    
+
     Args:
         repo_path: Path to the repository
         max_commits: Maximum number of commits to return
-        
+
     Returns:
         ToolResult with commit history
     """
-    import time
     start = time.perf_counter()
-    
+
     if not os.path.isdir(os.path.join(repo_path, ".git")):
         return ToolResult(
             ok=False,
             error_code="NOT_A_GIT_REPO",
             error_message="Directory is not a git repository",
         )
-    
+
+    if pygit2 is not None:
+        try:
+            data = await asyncio.to_thread(_log_pygit2, repo_path, max_commits)
+            latency_ms = int((time.perf_counter() - start) * 1000)
+            return ToolResult(ok=True, data=data, latency_ms=latency_ms)
+        except Exception:
+            _drop_repo(repo_path)
+
     try:
-        result = subprocess.run(
-            [
-                "git", "log",
-                f"-{max_commits}",
-                "--format=%H|%s|%an|%ad",
-                "--date=short",
-            ],
-            cwd=repo_path,
-            capture_output=True,
-            text=True,
-            timeout=10,
+        # NUL separators: a '|' in a commit subject broke the old
+        # pipe-delimited parse, and each record now splits in two passes
+        # instead of per-line slicing
+        stdout, _, _ = await _run_git(
+            repo_path,
+            "log",
+            f"-{max_commits}",
+            "--format=%H%x00%s%x00%an%x00%ad%x00%x00",
+            "--date=short",
         )
-        
+
         commits = []
-        for line in result.stdout.strip().split("\n"):
-            if not line:
+        for record in stdout.split("\x00\x00"):
+            record = record.strip("\n")
+            if not record:
                 continue
-            parts = line.split("|", 3)
-            if len(parts) == 4:
+            parts = record.split("\x00")
+            if len(parts) >= 4:
                 commits.append({
                     "hash": parts[0][:8],
                     "message": parts[1],
                     "author": parts[2],
                     "date": parts[3],
                 })
-        
+
         latency_ms = int((time.perf_counter() - start) * 1000)
-        
+
         return ToolResult(
             ok=True,
             data={
@@ -430,7 +717,7 @@ async def git_log(
             },
             latency_ms=latency_ms,
         )
-        
+
     except subprocess.TimeoutExpired:
         return ToolResult(
             ok=False,
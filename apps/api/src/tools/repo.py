@@ -9,24 +9,120 @@ These tools provide the agent with structured access to repository content:
 
 from __future__ import annotations
 
+import asyncio
+import concurrent.futures
+import fnmatch
+import functools
+import itertools
+import mmap
 import os
+import re
 import subprocess
+import tempfile
 import hashlib
 from pathlib import Path
 from typing import Any
 
 from src.schemas import ToolResult
 
+try:
+    import tree_sitter
+    import tree_sitter_javascript
+except ImportError:  # Regex fallback below covers these files
+    tree_sitter = None
+
 
 # Maximum file size to read (1MB)
 MAX_FILE_SIZE = 1024 * 1024
 
+# In-process repo_map cache. Key: (repo_path, max_depth, include_ast_summary,
+# ignore_patterns). Value: (fingerprint, stored_at, data). The fingerprint is
+# the mtimes of the repo root and its top-level directories — directory
+# mtimes change whenever entries are added/removed beneath them, which
+# covers the agent's write_file/commit traffic; write_file also invalidates
+# explicitly. Entries expire after a short TTL as a backstop for edits that
+# do not touch any tracked mtime.
+_REPO_MAP_CACHE_TTL_SECONDS = 30.0
+_repo_map_cache: dict[tuple, tuple[str, float, dict[str, Any]]] = {}
+
+
+def _repo_fingerprint(repo_path: str) -> str:
+    """Cheap change fingerprint: mtimes of the root and top-level dirs."""
+    parts = [str(os.stat(repo_path).st_mtime_ns)]
+    with os.scandir(repo_path) as it:
+        for entry in sorted(it, key=lambda e: e.name):
+            if entry.is_dir(follow_symlinks=False):
+                parts.append(f"{entry.name}:{entry.stat().st_mtime_ns}")
+    return "|".join(parts)
+
+
+def _invalidate_repo_map_cache(repo_path: str) -> None:
+    for key in [k for k in _repo_map_cache if k[0] == repo_path]:
+        del _repo_map_cache[key]
+
+
+# Extensions handled as code files. str.endswith dispatches over a tuple in
+# C, replacing the per-file Python loop over a set of suffixes.
+_CODE_EXT_TUPLE = (
+    ".py", ".js", ".ts", ".tsx", ".jsx", ".go", ".rs",
+    ".java", ".c", ".cpp", ".h", ".hpp", ".rb", ".php",
+    ".swift", ".kt", ".scala", ".vue", ".svelte",
+)
+
+_DEFAULT_IGNORE_PATTERNS = [
+    "__pycache__", ".git", "node_modules", ".venv", "venv",
+    ".next", "dist", "build", ".pytest_cache", ".mypy_cache",
+    "*.pyc", "*.pyo", ".DS_Store", "*.egg-info",
+]
+
+
+def _split_ignore_patterns(patterns: list[str]) -> tuple[frozenset[str], tuple[str, ...]]:
+    """Split ignore patterns into an exact-name set and a suffix tuple.
+
+    Turns the per-entry linear pattern scan into one set probe plus one
+    C-level endswith over all suffixes.
+    """
+    exact = frozenset(p for p in patterns if not p.startswith("*"))
+    suffixes = tuple(p[1:] for p in patterns if p.startswith("*"))
+    return exact, suffixes
+
+
+_DEFAULT_IGNORE = _split_ignore_patterns(_DEFAULT_IGNORE_PATTERNS)
+
+# Worker pool for AST summarization. ast.parse is pure-CPU and holds the
+# GIL, so threads would serialize; separate processes parse files in
+# parallel. Created lazily so importing this module never spawns workers.
+_ast_pool: concurrent.futures.ProcessPoolExecutor | None = None
+
+
+def _get_ast_pool() -> concurrent.futures.ProcessPoolExecutor:
+    global _ast_pool
+    if _ast_pool is None:
+        _ast_pool = concurrent.futures.ProcessPoolExecutor(
+            max_workers=min(4, os.cpu_count() or 1)
+        )
+    return _ast_pool
+
+
+@functools.lru_cache(maxsize=64)
+def _repo_realpath(repo_path: str) -> str:
+    """Resolved repo root, cached — every read/write re-checks the same roots."""
+    return os.path.realpath(repo_path)
+
 
 def _is_safe_path(repo_path: str, file_path: str) -> bool:
-    """Check if file_path is safely within repo_path."""
-    repo_abs = os.path.abspath(repo_path)
-    file_abs = os.path.abspath(os.path.join(repo_path, file_path))
-    return file_abs.startswith(repo_abs)
+    """Check if file_path is safely within repo_path.
+
+    commonpath instead of startswith: a prefix check would accept a
+    sibling like /repo-evil for root /repo. realpath also resolves
+    symlinks that abspath would leave pointing outside the repo.
+    """
+    repo_abs = _repo_realpath(repo_path)
+    file_abs = os.path.realpath(os.path.join(repo_path, file_path))
+    try:
+        return os.path.commonpath([repo_abs, file_abs]) == repo_abs
+    except ValueError:
+        return False
 
 
 async def repo_map(
@@ -55,25 +151,44 @@ async def repo_map(
             error_code="INVALID_PATH",
             error_message=f"Repository path does not exist: {repo_path}",
         )
-    
+
+    cache_key = (
+        repo_path,
+        max_depth,
+        include_ast_summary,
+        tuple(ignore_patterns) if ignore_patterns else None,
+    )
+    try:
+        fingerprint = _repo_fingerprint(repo_path)
+    except OSError:
+        fingerprint = ""
+    if fingerprint:
+        cached = _repo_map_cache.get(cache_key)
+        if cached is not None:
+            cached_fp, stored_at, cached_data = cached
+            if (
+                cached_fp == fingerprint
+                and time.monotonic() - stored_at < _REPO_MAP_CACHE_TTL_SECONDS
+            ):
+                # Steady state: skip the recursive walk and AST parsing
+                return ToolResult(
+                    ok=True,
+                    data=cached_data,
+                    latency_ms=int((time.perf_counter() - start) * 1000),
+                )
+
     if ignore_patterns is None:
-        ignore_patterns = [
-            "__pycache__", ".git", "node_modules", ".venv", "venv",
-            ".next", "dist", "build", ".pytest_cache", ".mypy_cache",
-            "*.pyc", "*.pyo", ".DS_Store", "*.egg-info"
-        ]
+        ignore_exact, ignore_suffixes = _DEFAULT_IGNORE
+    else:
+        ignore_exact, ignore_suffixes = _split_ignore_patterns(ignore_patterns)
     
     tree: dict[str, Any] = {"type": "directory", "name": os.path.basename(repo_path), "children": []}
     key_files: list[dict[str, Any]] = []
     
     def should_ignore(name: str) -> bool:
-        for pattern in ignore_patterns:
-            if pattern.startswith("*"):
-                if name.endswith(pattern[1:]):
-                    return True
-            elif name == pattern:
-                return True
-        return False
+        return name in ignore_exact or (
+            bool(ignore_suffixes) and name.endswith(ignore_suffixes)
+        )
     
     def build_tree(path: str, current_depth: int) -> list[dict[str, Any]]:
         if current_depth > max_depth:
@@ -81,43 +196,46 @@ async def repo_map(
         
         items = []
         try:
-            entries = sorted(os.listdir(path))
+            # One scandir pass: DirEntry caches the dirent/stat data, so
+            # is_dir() and stat().st_size below cost no extra syscalls
+            # (listdir + isdir + getsize was three per entry)
+            entries = sorted(os.scandir(path), key=lambda e: e.name)
         except PermissionError:
             return []
         
         for entry in entries:
-            if should_ignore(entry):
+            name = entry.name
+            if should_ignore(name):
                 continue
             
-            full_path = os.path.join(path, entry)
-            rel_path = os.path.relpath(full_path, repo_path)
+            rel_path = os.path.relpath(entry.path, repo_path)
             
-            if os.path.isdir(full_path):
-                children = build_tree(full_path, current_depth + 1)
+            if entry.is_dir(follow_symlinks=False):
+                children = build_tree(entry.path, current_depth + 1)
                 if children or current_depth < 2:  # Always show top-level dirs
                     items.append({
                         "type": "directory",
-                        "name": entry,
+                        "name": name,
                         "path": rel_path,
                         "children": children,
                     })
             else:
                 file_info: dict[str, Any] = {
                     "type": "file",
-                    "name": entry,
+                    "name": name,
                     "path": rel_path,
                 }
                 
                 # Get file size
                 try:
-                    file_info["size"] = os.path.getsize(full_path)
+                    file_info["size"] = entry.stat().st_size
                 except OSError:
                     file_info["size"] = 0
                 
                 items.append(file_info)
                 
                 # Add to key files if it's a code file
-                if _is_code_file(entry) and file_info["size"] < MAX_FILE_SIZE:
+                if _is_code_file(name) and file_info["size"] < MAX_FILE_SIZE:
                     key_files.append({
                         "path": rel_path,
                         "size": file_info["size"],
@@ -127,54 +245,75 @@ async def repo_map(
     
     tree["children"] = build_tree(repo_path, 0)
     
-    # Generate AST summaries for key files
+    # Generate AST summaries for key files, fanned out over the process
+    # pool so the batch takes roughly its longest file instead of the sum
     ast_summaries: dict[str, list[str]] = {}
-    if include_ast_summary:
-        for key_file in key_files[:50]:  # Limit to 50 files
-            summary = await _get_ast_summary(
-                os.path.join(repo_path, key_file["path"])
+    if include_ast_summary and key_files:
+        selected = key_files[:50]  # Limit to 50 files
+        paths = [os.path.join(repo_path, kf["path"]) for kf in selected]
+        loop = asyncio.get_running_loop()
+        try:
+            pool = _get_ast_pool()
+            summaries = await asyncio.gather(
+                *(loop.run_in_executor(pool, _ast_summary_sync, p) for p in paths)
             )
+        except Exception:
+            # Pool unavailable (restricted environment): parse serially
+            # off the event loop instead
+            summaries = [
+                await asyncio.to_thread(_ast_summary_sync, p) for p in paths
+            ]
+        for key_file, summary in zip(selected, summaries):
             if summary:
                 ast_summaries[key_file["path"]] = summary
     
     latency_ms = int((time.perf_counter() - start) * 1000)
-    
+
+    data = {
+        "tree": tree,
+        "key_files": key_files[:50],
+        "ast_summaries": ast_summaries,
+        "total_files": len(key_files),
+    }
+    if fingerprint:
+        _repo_map_cache[cache_key] = (fingerprint, time.monotonic(), data)
+
     return ToolResult(
         ok=True,
-        data={
-            "tree": tree,
-            "key_files": key_files[:50],
-            "ast_summaries": ast_summaries,
-            "total_files": len(key_files),
-        },
+        data=data,
         latency_ms=latency_ms,
     )
 
 
 def _is_code_file(filename: str) -> bool:
     """Check if file is a code file we should analyze."""
-    code_extensions = {
-        ".py", ".js", ".ts", ".tsx", ".jsx", ".go", ".rs",
-        ".java", ".c", ".cpp", ".h", ".hpp", ".rb", ".php",
-        ".swift", ".kt", ".scala", ".vue", ".svelte",
-    }
-    return any(filename.endswith(ext) for ext in code_extensions)
+    return filename.endswith(_CODE_EXT_TUPLE)
+
 
+def _ast_summary_sync(file_path: str) -> list[str]:
+    """Extract function/class signatures using AST or regex fallback.
 
-async def _get_ast_summary(file_path: str) -> list[str]:
-    """Extract function/class signatures using tree-sitter or regex fallback."""
+    Plain sync function at module top level so it pickles into the
+    process pool workers.
+    """
     if not os.path.exists(file_path):
         return []
     
-    # Try tree-sitter first
     if file_path.endswith(".py"):
-        return await _get_python_ast_summary(file_path)
+        return _get_python_ast_summary(file_path)
+
+    # JS-family files: a real parse beats the regex heuristics (it sees
+    # through strings, comments and multi-line declarations)
+    if file_path.endswith(_TS_JS_EXTS):
+        summary = _get_js_summary(file_path)
+        if summary is not None:
+            return summary
     
     # Fallback to simple regex-based extraction
     return _get_regex_summary(file_path)
 
 
-async def _get_python_ast_summary(file_path: str) -> list[str]:
+def _get_python_ast_summary(file_path: str) -> list[str]:
     """Extract Python function/class signatures using AST."""
     import ast
     
@@ -184,16 +323,18 @@ async def _get_python_ast_summary(file_path: str) -> list[str]:
         
         tree = ast.parse(source)
         signatures = []
-        
-        for node in ast.walk(tree):
-            if isinstance(node, ast.FunctionDef):
-                args = ", ".join(arg.arg for arg in node.args.args)
-                sig = f"def {node.name}({args})"
-                signatures.append(sig)
-            elif isinstance(node, ast.AsyncFunctionDef):
-                args = ", ".join(arg.arg for arg in node.args.args)
-                sig = f"async def {node.name}({args})"
-                signatures.append(sig)
+
+        def add_function(node: ast.FunctionDef | ast.AsyncFunctionDef) -> None:
+            args = ", ".join(arg.arg for arg in node.args.args)
+            prefix = "async def" if isinstance(node, ast.AsyncFunctionDef) else "def"
+            signatures.append(f"{prefix} {node.name}({args})")
+
+        # Only module-level defs and class bodies carry API surface;
+        # ast.walk would also visit every statement and expression inside
+        # function bodies just to discard them
+        for node in tree.body:
+            if isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef)):
+                add_function(node)
             elif isinstance(node, ast.ClassDef):
                 bases = ", ".join(
                     getattr(base, "id", getattr(base, "attr", ""))
@@ -201,6 +342,9 @@ async def _get_python_ast_summary(file_path: str) -> list[str]:
                 )
                 sig = f"class {node.name}({bases})" if bases else f"class {node.name}"
                 signatures.append(sig)
+                for member in node.body:
+                    if isinstance(member, (ast.FunctionDef, ast.AsyncFunctionDef)):
+                        add_function(member)
         
         return signatures[:20]  # Limit signatures per file
         
@@ -208,26 +352,97 @@ async def _get_python_ast_summary(file_path: str) -> list[str]:
         return []
 
 
+# tree-sitter extraction for JavaScript-family files. One parser and one
+# compiled query per process, built lazily; any failure (missing grammar,
+# binding API drift) flips _js_init_failed and the regex fallback takes
+# over permanently.
+_TS_JS_EXTS = (".js", ".jsx", ".mjs", ".cjs")
+
+_TS_JS_QUERY = """
+(function_declaration name: (identifier) @name)
+(class_declaration name: (identifier) @name)
+(variable_declarator
+  name: (identifier) @name
+  value: (arrow_function))
+"""
+
+_js_parser = None
+_js_query = None
+_js_init_failed = False
+
+
+def _init_js_parser() -> bool:
+    global _js_parser, _js_query, _js_init_failed
+    if _js_parser is not None:
+        return True
+    if _js_init_failed or tree_sitter is None:
+        return False
+    try:
+        language = tree_sitter.Language(tree_sitter_javascript.language())
+        try:
+            parser = tree_sitter.Parser(language)
+        except TypeError:
+            # Older binding API
+            parser = tree_sitter.Parser()
+            parser.set_language(language)
+        _js_query = language.query(_TS_JS_QUERY)
+        _js_parser = parser
+        return True
+    except Exception:
+        _js_init_failed = True
+        return False
+
+
+def _get_js_summary(file_path: str) -> list[str] | None:
+    """Extract JS declaration names via tree-sitter; None means fall back."""
+    if not _init_js_parser():
+        return None
+    try:
+        with open(file_path, "rb") as f:
+            source = f.read(50000)  # First 50KB only, like the regex path
+        tree = _js_parser.parse(source)
+        captures = _js_query.captures(tree.root_node)
+        if isinstance(captures, dict):
+            # tree-sitter >= 0.22 returns {capture_name: [nodes]}
+            nodes = [n for group in captures.values() for n in group]
+        else:
+            nodes = [n for n, _ in captures]
+        nodes.sort(key=lambda n: n.start_byte)
+        names: list[str] = []
+        seen: set[str] = set()
+        for node in nodes:
+            text = node.text.decode("utf-8", errors="replace")
+            if text not in seen:
+                seen.add(text)
+                names.append(text)
+        return names[:20]
+    except Exception:
+        return None
+
+
+# JavaScript/TypeScript signature patterns, compiled once at import so
+# extraction never depends on re's shared pattern cache
+_SUMMARY_RES = [
+    re.compile(r"(?:export\s+)?(?:async\s+)?function\s+(\w+)\s*\("),
+    re.compile(r"(?:export\s+)?class\s+(\w+)"),
+    re.compile(r"(?:const|let|var)\s+(\w+)\s*=\s*(?:async\s+)?\([^)]*\)\s*=>"),
+]
+
+
 def _get_regex_summary(file_path: str) -> list[str]:
     """Simple regex-based extraction for non-Python files."""
-    import re
-    
     try:
         with open(file_path, "r", encoding="utf-8", errors="ignore") as f:
             content = f.read(50000)  # First 50KB only
         
         signatures = []
         
-        # JavaScript/TypeScript function patterns
-        patterns = [
-            r"(?:export\s+)?(?:async\s+)?function\s+(\w+)\s*\(",
-            r"(?:export\s+)?class\s+(\w+)",
-            r"(?:const|let|var)\s+(\w+)\s*=\s*(?:async\s+)?\([^)]*\)\s*=>",
-        ]
-        
-        for pattern in patterns:
-            matches = re.findall(pattern, content)
-            signatures.extend(matches[:10])
+        for rx in _SUMMARY_RES:
+            # islice stops the scan after 10 hits instead of matching the
+            # whole buffer and slicing afterwards
+            signatures.extend(
+                m.group(1) for m in itertools.islice(rx.finditer(content), 10)
+            )
         
         return signatures[:20]
         
@@ -288,24 +503,21 @@ async def read_file(
         )
     
     try:
-        with open(full_path, "r", encoding="utf-8", errors="replace") as f:
-            lines = f.readlines()
-        
-        total_lines = len(lines)
-        
-        # Apply line range if specified
-        if start_line is not None:
-            start_idx = max(0, start_line - 1)
+        if start_line is not None or end_line is not None:
+            # Range request: mmap the file and seek by newline offsets, so
+            # only the requested slice is decoded into Python strings
+            # instead of materializing every line via readlines
+            content, total_lines, start_idx, end_idx = _read_range_mmap(
+                full_path, start_line, end_line
+            )
         else:
+            with open(full_path, "r", encoding="utf-8", errors="replace") as f:
+                lines = f.readlines()
+
+            total_lines = len(lines)
             start_idx = 0
-        
-        if end_line is not None:
-            end_idx = min(len(lines), end_line)
-        else:
-            end_idx = len(lines)
-        
-        selected_lines = lines[start_idx:end_idx]
-        content = "".join(selected_lines)
+            end_idx = total_lines
+            content = "".join(lines)
         
         latency_ms = int((time.perf_counter() - start) * 1000)
         
@@ -331,6 +543,64 @@ async def read_file(
         )
 
 
+def _read_range_mmap(
+    full_path: str,
+    start_line: int | None,
+    end_line: int | None,
+) -> tuple[str, int, int, int]:
+    """Read a 1-indexed line range via mmap.
+
+    Returns (content, total_lines, start_idx, end_idx) with the same
+    slice semantics as readlines()[start_idx:end_idx]. Bytes before the
+    range are only scanned for newlines, never copied or decoded.
+    """
+    with open(full_path, "rb") as f:
+        try:
+            mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:
+            # Empty file cannot be mapped; keep the same clamped indices
+            # the readlines path would report
+            start_idx = max(0, start_line - 1) if start_line is not None else 0
+            return "", 0, start_idx, 0
+
+        with mm:
+            size = len(mm)
+            total_lines = 0
+            scan = 0
+            while True:
+                nl = mm.find(b"\n", scan)
+                if nl == -1:
+                    break
+                total_lines += 1
+                scan = nl + 1
+            if size and mm[size - 1:size] != b"\n":
+                total_lines += 1
+
+            start_idx = max(0, start_line - 1) if start_line is not None else 0
+            end_idx = min(total_lines, end_line) if end_line is not None else total_lines
+
+            # Advance past start_idx newlines to the range's byte offset
+            pos = 0
+            for _ in range(start_idx):
+                nl = mm.find(b"\n", pos)
+                if nl == -1:
+                    pos = size
+                    break
+                pos = nl + 1
+
+            end_pos = pos
+            for _ in range(max(0, end_idx - start_idx)):
+                nl = mm.find(b"\n", end_pos)
+                if nl == -1:
+                    end_pos = size
+                    break
+                end_pos = nl + 1
+
+            content = mm[pos:end_pos].decode("utf-8", errors="replace")
+
+    return content, total_lines, start_idx, end_idx
+
+
 async def search_repo(
     repo_path: str,
     query: str,
@@ -366,39 +636,57 @@ async def search_repo(
     
     cmd.append(query)
     
+    import json
+
     try:
-        result = subprocess.run(
-            cmd,
+        # Stream rg's JSON events line by line instead of buffering the
+        # whole output: memory stays flat on broad queries, the event loop
+        # keeps turning, and rg is killed as soon as max_results is hit
+        proc = await asyncio.create_subprocess_exec(
+            *cmd,
             cwd=repo_path,
-            capture_output=True,
-            text=True,
-            timeout=30,
+            stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.DEVNULL,
+            limit=1024 * 1024,
         )
-        
-        # Parse ripgrep JSON output
-        import json
         matches = []
-        for line in result.stdout.strip().split("\n"):
-            if not line:
-                continue
-            try:
-                data = json.loads(line)
-                if data.get("type") == "match":
+        try:
+            async with asyncio.timeout(30):
+                async for raw_line in proc.stdout:
+                    if not raw_line.strip():
+                        continue
+                    try:
+                        data = json.loads(raw_line)
+                    except json.JSONDecodeError:
+                        continue
+                    if data.get("type") != "match":
+                        continue
                     match_data = data.get("data", {})
                     matches.append({
                         "path": match_data.get("path", {}).get("text", ""),
                         "line_number": match_data.get("line_number", 0),
                         "line_content": match_data.get("lines", {}).get("text", "").strip(),
                     })
-            except json.JSONDecodeError:
-                continue
-        
+                    if len(matches) >= max_results:
+                        proc.kill()
+                        break
+        except TimeoutError:
+            proc.kill()
+            await proc.wait()
+            return ToolResult(
+                ok=False,
+                error_code="SEARCH_TIMEOUT",
+                error_message="Search timed out after 30 seconds",
+                retryable=True,
+            )
+        await proc.wait()
+
         latency_ms = int((time.perf_counter() - start) * 1000)
         
         return ToolResult(
             ok=True,
             data={
-                "matches": matches[:max_results],
+                "matches": matches,
                 "total_matches": len(matches),
                 "query": query,
             },
@@ -406,15 +694,8 @@ async def search_repo(
         )
         
     except FileNotFoundError:
-        # Ripgrep not installed, fall back to grep
-        return await _search_with_grep(repo_path, query, file_pattern, max_results)
-    except subprocess.TimeoutExpired:
-        return ToolResult(
-            ok=False,
-            error_code="SEARCH_TIMEOUT",
-            error_message="Search timed out after 30 seconds",
-            retryable=True,
-        )
+        # Ripgrep not installed, fall back to an in-process scan
+        return await _search_in_process(repo_path, query, file_pattern, max_results)
     except Exception as e:
         return ToolResult(
             ok=False,
@@ -424,39 +705,95 @@ async def search_repo(
         )
 
 
-async def _search_with_grep(
+def _search_files_sync(
+    repo_path: str,
+    query: str,
+    file_pattern: str | None,
+    max_results: int,
+) -> list[dict[str, Any]]:
+    """Scan candidate files with a compiled regex over mmap.
+
+    One matching line yields one result (grep -n semantics); the scan
+    stops as soon as max_results lines are collected. mmap keeps the
+    byte scan zero-copy — only matched lines are decoded.
+    """
+    pat = re.compile(query.encode("utf-8", errors="replace"))
+    ignore_exact, ignore_suffixes = _DEFAULT_IGNORE
+    matches: list[dict[str, Any]] = []
+
+    for dirpath, dirnames, filenames in os.walk(repo_path):
+        dirnames[:] = [
+            d for d in dirnames
+            if d not in ignore_exact
+            and not (ignore_suffixes and d.endswith(ignore_suffixes))
+        ]
+        for name in sorted(filenames):
+            if file_pattern:
+                if not fnmatch.fnmatch(name, file_pattern):
+                    continue
+            elif not _is_code_file(name):
+                continue
+
+            full = os.path.join(dirpath, name)
+            try:
+                with open(full, "rb") as fh:
+                    try:
+                        mm = mmap.mmap(fh.fileno(), 0, access=mmap.ACCESS_READ)
+                    except ValueError:
+                        continue
+                    with mm:
+                        rel = os.path.relpath(full, repo_path)
+                        size = len(mm)
+                        pos = 0
+                        prev = 0
+                        line_no = 1
+                        while len(matches) < max_results:
+                            m = pat.search(mm, pos)
+                            if m is None:
+                                break
+                            match_start = m.start()
+                            line_no += mm[prev:match_start].count(b"\n")
+                            prev = match_start
+                            line_start = mm.rfind(b"\n", 0, match_start) + 1
+                            line_end = mm.find(b"\n", match_start)
+                            if line_end == -1:
+                                line_end = size
+                            matches.append({
+                                "path": rel,
+                                "line_number": line_no,
+                                "line_content": mm[line_start:line_end]
+                                .decode("utf-8", errors="replace")
+                                .strip(),
+                            })
+                            # Resume after this line: one result per line
+                            pos = line_end + 1
+            except OSError:
+                continue
+            if len(matches) >= max_results:
+                return matches
+    return matches
+
+
+async def _search_in_process(
     repo_path: str,
     query: str,
     file_pattern: str | None,
     max_results: int,
 ) -> ToolResult:
-    """Fallback search using grep."""
+    """Fallback search without ripgrep: regex over mmap'd files.
+
+    Replaces the old grep subprocess, which hardcoded its --include list
+    and ignored file_pattern; for small repos the fork alone cost more
+    than the scan.
+    """
     import time
     start = time.perf_counter()
-    
-    cmd = ["grep", "-rn", "--include=*.py", "--include=*.js", "--include=*.ts", query, "."]
-    
+
     try:
-        result = subprocess.run(
-            cmd,
-            cwd=repo_path,
-            capture_output=True,
-            text=True,
-            timeout=30,
+        matches = await asyncio.to_thread(
+            _search_files_sync, repo_path, query, file_pattern, max_results
         )
         
-        matches = []
-        for line in result.stdout.strip().split("\n")[:max_results]:
-            if not line:
-                continue
-            parts = line.split(":", 2)
-            if len(parts) >= 3:
-                matches.append({
-                    "path": parts[0].lstrip("./"),
-                    "line_number": int(parts[1]) if parts[1].isdigit() else 0,
-                    "line_content": parts[2].strip(),
-                })
-        
         latency_ms = int((time.perf_counter() - start) * 1000)
         
         return ToolResult(
@@ -468,14 +805,27 @@ async def _search_with_grep(
             },
             latency_ms=latency_ms,
         )
+    except re.error as e:
+        return ToolResult(
+            ok=False,
+            error_code="INVALID_QUERY",
+            error_message=f"Invalid search pattern: {e}",
+        )
     except Exception as e:
         return ToolResult(
             ok=False,
-            error_code="GREP_ERROR",
+            error_code="SEARCH_ERROR",
             error_message=str(e),
+            retryable=True,
         )
 
 
+# Process umask, read once at import: reading it requires a set/restore
+# pair, which would race between threads if done per call
+_UMASK = os.umask(0)
+os.umask(_UMASK)
+
+
 async def write_file(
     repo_path: str,
     file_path: str,
@@ -505,24 +855,51 @@ async def write_file(
     
     full_path = os.path.join(repo_path, file_path)
     
-    # Check if file exists (for diff)
-    original_content = None
-    if os.path.exists(full_path):
-        try:
-            with open(full_path, "r", encoding="utf-8", errors="replace") as f:
-                original_content = f.read()
-        except Exception:
-            pass
+    # One stat answers created-vs-modified and captures the prior mode so
+    # the temp-file replace below can preserve it; reading the old content
+    # in full would double the I/O without anyone consuming it
+    try:
+        prior_mode = os.stat(full_path).st_mode
+    except OSError:
+        prior_mode = None
+    existed = prior_mode is not None
     
     try:
         if create_dirs:
             os.makedirs(os.path.dirname(full_path), exist_ok=True)
         
-        with open(full_path, "w", encoding="utf-8") as f:
-            f.write(content)
-        
-        # Calculate content hash
-        content_hash = hashlib.sha256(content.encode()).hexdigest()[:16]
+        # Encode once: the same buffer is written and hashed, instead of
+        # text-mode write re-encoding what .encode() already produced
+        data = content.encode("utf-8")
+
+        # Write to a sibling temp file and rename into place: the replace
+        # is atomic, so a crash mid-write never leaves a truncated file
+        # and concurrent readers see either the old or the new content
+        tmp_fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(full_path) or ".")
+        try:
+            os.write(tmp_fd, data)
+            # mkstemp creates the file 0600; restore the destination's
+            # prior mode (or the umask default for new files) so scripts
+            # keep their executable bit and shared files stay readable
+            os.fchmod(
+                tmp_fd,
+                prior_mode & 0o7777 if prior_mode is not None else 0o666 & ~_UMASK,
+            )
+            os.close(tmp_fd)
+            os.replace(tmp_path, full_path)
+        except BaseException:
+            try:
+                os.close(tmp_fd)
+            except OSError:
+                pass
+            if os.path.exists(tmp_path):
+                os.unlink(tmp_path)
+            raise
+        
+        content_hash = hashlib.sha256(data, usedforsecurity=False).hexdigest()[:16]
+
+        # The tree changed; cached repo maps for this repo are stale
+        _invalidate_repo_map_cache(repo_path)
         
         latency_ms = int((time.perf_counter() - start) * 1000)
         
@@ -532,8 +909,8 @@ async def write_file(
                 "path": file_path,
                 "size": len(content),
                 "hash": content_hash,
-                "created": original_content is None,
-                "modified": original_content is not None,
+                "created": not existed,
+                "modified": existed,
             },
             latency_ms=latency_ms,
             artifacts=[full_path],
@@ -9,17 +9,89 @@ Runs commands (tests/lint/build) in isolated environment:
 
 from __future__ import annotations
 
-import subprocess
+import asyncio
+import collections
 import os
+import re
 import shlex
-from typing import Any
+from typing import Any, Callable
 
 from src.config import get_settings
 from src.schemas import ToolResult
 
 
+# Resolved once at import: every tool call consulted pydantic settings and
+# scanned the allowlist as a list. Module constants follow the pattern in
+# config.py for hot-path fields.
+_SETTINGS = get_settings()
+_ALLOWED_COMMANDS = frozenset(_SETTINGS.sandbox_allowed_commands)
+_DEFAULT_TIMEOUT_SECONDS = _SETTINGS.sandbox_timeout_seconds
+
+def _validate_python_argv(parts: list[str]) -> str | None:
+    """Only allow `python -m <tool>` for allowlisted tools.
+
+    Bare `python script.py` or `python -c ...` executes arbitrary code,
+    which would make the command allowlist decorative.
+    """
+    if len(parts) < 3 or parts[1] != "-m":
+        return "python must be invoked as 'python -m <module> ...'"
+    if parts[2] not in _ALLOWED_COMMANDS:
+        return f"python -m {parts[2]} is not in allowlist"
+    return None
+
+
+def _validate_ruff_argv(parts: list[str]) -> str | None:
+    """Restrict ruff to its read/fix subcommands (no `ruff server` etc.)."""
+    if len(parts) < 2 or parts[1] not in ("check", "format"):
+        return "ruff must be invoked as 'ruff check ...' or 'ruff format ...'"
+    return None
+
+
+# Argv shape checks beyond the base-command allowlist, keyed by parts[0].
+# Commands without an entry pass through on the allowlist alone.
+_VALIDATORS: dict[str, Callable[[list[str]], str | None]] = {
+    "python": _validate_python_argv,
+    "ruff": _validate_ruff_argv,
+}
+
+# Parent environment snapshot, copied once at import instead of per spawn.
+# Passing the shared dict is safe: subprocess only reads it.
+_BASE_ENV = dict(os.environ)
+
+# Counts from pytest's final '=== N passed, M failed ... ===' line
+_PYTEST_SUMMARY_RE = re.compile(r"(\d+) (passed|failed|errors?|skipped)\b")
+
+# Output capture bounds. A verbose pytest run can emit tens of MB; only
+# the most recent chunks are retained, since failure diagnostics live at
+# the end of the output. Decoding happens once, on the retained tail.
+_MAX_CAPTURE_BYTES = 256 * 1024
+_READ_CHUNK_BYTES = 64 * 1024
+
+
+async def _read_tail(stream: asyncio.StreamReader) -> str:
+    """Drain a pipe, keeping only the last ~_MAX_CAPTURE_BYTES of output."""
+    chunks: collections.deque[bytes] = collections.deque()
+    total = 0
+    while True:
+        chunk = await stream.read(_READ_CHUNK_BYTES)
+        if not chunk:
+            break
+        chunks.append(chunk)
+        total += len(chunk)
+        while total > _MAX_CAPTURE_BYTES and len(chunks) > 1:
+            total -= len(chunks.popleft())
+    return b"".join(chunks).decode(errors="replace")
+
+
+# Working directories validated recently, path -> monotonic timestamp. An
+# agent loop dispatches dozens of commands against the same checkout; the
+# TTL keeps the stat traffic at one per directory per window.
+_CWD_CACHE: dict[str, float] = {}
+_CWD_CACHE_TTL_SECONDS = 5.0
+
+
 async def run_command(
-    command: str,
+    command: str | list[str],
     cwd: str,
     timeout: int | None = None,
     env: dict[str, str] | None = None,
@@ -27,7 +99,8 @@ async def run_command(
     """Run a command in a controlled environment.
     
     Args:
-        command: Command to run (will be validated against allowlist)
+        command: Command to run (validated against allowlist). An argv
+            list is executed as-is; a string goes through shlex first.
         cwd: Working directory
         timeout: Command timeout in seconds
         env: Additional environment variables
@@ -38,20 +111,24 @@ async def run_command(
     import time
     start = time.perf_counter()
     
-    settings = get_settings()
-    
     if timeout is None:
-        timeout = settings.sandbox_timeout_seconds
+        timeout = _DEFAULT_TIMEOUT_SECONDS
     
-    # Parse command to check against allowlist
-    try:
-        parts = shlex.split(command)
-    except ValueError as e:
-        return ToolResult(
-            ok=False,
-            error_code="INVALID_COMMAND",
-            error_message=f"Invalid command syntax: {e}",
-        )
+    # Argv lists skip the split/re-quote round trip entirely — internal
+    # callers already build argv, and joining just to re-split invites
+    # quoting bugs on paths with spaces
+    if isinstance(command, list):
+        parts = command
+    else:
+        # Parse command to check against allowlist
+        try:
+            parts = shlex.split(command)
+        except ValueError as e:
+            return ToolResult(
+                ok=False,
+                error_code="INVALID_COMMAND",
+                error_message=f"Invalid command syntax: {e}",
+            )
     
     if not parts:
         return ToolResult(
@@ -63,64 +140,104 @@ async def run_command(
     base_command = parts[0]
     
     # Check allowlist
-    allowed = settings.sandbox_allowed_commands
-    if base_command not in allowed:
+    if base_command not in _ALLOWED_COMMANDS:
         return ToolResult(
             ok=False,
             error_code="COMMAND_NOT_ALLOWED",
-            error_message=f"Command '{base_command}' is not in allowlist: {allowed}",
+            error_message=(
+                f"Command '{base_command}' is not in allowlist: "
+                f"{sorted(_ALLOWED_COMMANDS)}"
+            ),
         )
-    
-    # Validate working directory
-    if not os.path.isdir(cwd):
+
+    # Per-command argv validation: exec'ing a ready argv means nothing is
+    # re-quoted or re-split downstream, so this is the one checkpoint
+    validator = _VALIDATORS.get(base_command)
+    if validator is not None and (problem := validator(parts)) is not None:
         return ToolResult(
             ok=False,
-            error_code="INVALID_CWD",
-            error_message=f"Working directory does not exist: {cwd}",
+            error_code="COMMAND_NOT_ALLOWED",
+            error_message=problem,
         )
+
+    # Validate working directory (cached: repeat dispatches against the
+    # same checkout skip the stat)
+    now = time.monotonic()
+    checked_at = _CWD_CACHE.get(cwd)
+    if checked_at is None or now - checked_at >= _CWD_CACHE_TTL_SECONDS:
+        if not os.path.isdir(cwd):
+            _CWD_CACHE.pop(cwd, None)
+            return ToolResult(
+                ok=False,
+                error_code="INVALID_CWD",
+                error_message=f"Working directory does not exist: {cwd}",
+            )
+        _CWD_CACHE[cwd] = now
     
     # Build environment
-    run_env = os.environ.copy()
-    if env:
-        run_env.update(env)
+    run_env = {**_BASE_ENV, **env} if env else _BASE_ENV
+
+    # Shell-quoted form, for the response payload only
+    command_display = (
+        command if isinstance(command, str)
+        else " ".join(shlex.quote(p) for p in parts)
+    )
     
     try:
-        result = subprocess.run(
-            parts,
+        # Async subprocess: a 120s pytest run must not pin the event-loop
+        # thread — concurrent tool calls and API handlers keep progressing,
+        # and gathered checks actually run in parallel
+        proc = await asyncio.create_subprocess_exec(
+            *parts,
             cwd=cwd,
-            capture_output=True,
-            text=True,
-            timeout=timeout,
             env=run_env,
+            stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.PIPE,
+            # Skip the close-inherited-fds pass on spawn. Safe because every
+            # fd Python opens (sockets, db connections) is non-inheritable
+            # since PEP 446, so nothing leaks into the child; it also keeps
+            # the spawn eligible for CPython's posix_spawn fast path.
+            close_fds=False,
         )
-        
+        async def _capture() -> tuple[str, str]:
+            out, err = await asyncio.gather(
+                _read_tail(proc.stdout), _read_tail(proc.stderr)
+            )
+            await proc.wait()
+            return out, err
+
+        try:
+            stdout, stderr = await asyncio.wait_for(_capture(), timeout=timeout)
+        except (asyncio.TimeoutError, TimeoutError):
+            proc.kill()
+            await proc.wait()
+            return ToolResult(
+                ok=False,
+                error_code="COMMAND_TIMEOUT",
+                error_message=f"Command timed out after {timeout} seconds",
+                data={
+                    "stdout": "",
+                    "stderr": "",
+                    "command": command_display,
+                },
+                retryable=True,
+            )
+
         latency_ms = int((time.perf_counter() - start) * 1000)
         
         return ToolResult(
-            ok=result.returncode == 0,
+            ok=proc.returncode == 0,
             data={
-                "stdout": result.stdout,
-                "stderr": result.stderr,
-                "exit_code": result.returncode,
-                "command": command,
+                "stdout": stdout,
+                "stderr": stderr,
+                "exit_code": proc.returncode,
+                "command": command_display,
             },
-            error_code="COMMAND_FAILED" if result.returncode != 0 else None,
-            error_message=result.stderr if result.returncode != 0 else None,
+            error_code="COMMAND_FAILED" if proc.returncode != 0 else None,
+            error_message=stderr if proc.returncode != 0 else None,
             latency_ms=latency_ms,
         )
         
-    except subprocess.TimeoutExpired as e:
-        return ToolResult(
-            ok=False,
-            error_code="COMMAND_TIMEOUT",
-            error_message=f"Command timed out after {timeout} seconds",
-            data={
-                "stdout": e.stdout if e.stdout else "",
-                "stderr": e.stderr if e.stderr else "",
-                "command": command,
-            },
-            retryable=True,
-        )
     except Exception as e:
         return ToolResult(
             ok=False,
@@ -133,72 +250,113 @@ async def run_command(
 async def run_tests(
     repo_path: str,
     test_path: str | None = None,
-    verbose: bool = True,
+    verbose: bool = False,
 ) -> ToolResult:
     """Run pytest in the repository.
-    
+
     Args:
         repo_path: Path to the repository
         test_path: Optional specific test file/dir
         verbose: Whether to run with verbose output
-        
+
     Returns:
         ToolResult with test results
     """
     cmd_parts = ["pytest"]
-    
+
     if verbose:
         cmd_parts.append("-v")
-    
+    else:
+        # The agent only reads the exit code and the summary line, so per-
+        # test output and full tracebacks are wasted bytes in the capture
+        # tail; skipping the cache plugin also avoids .pytest_cache writes
+        # into the target repo
+        cmd_parts.extend(["-q", "--tb=line", "-p", "no:cacheprovider"])
+
     if test_path:
         cmd_parts.append(test_path)
     
-    command = " ".join(cmd_parts)
-    
-    result = await run_command(command, cwd=repo_path, timeout=120)
+    result = await run_command(cmd_parts, cwd=repo_path, timeout=120)
     
     # Enhance result with test parsing
-    if result.ok and result.data:
-        stdout = result.data.get("stdout", "")
-        
-        # Parse pytest output for summary
-        passed = stdout.count(" passed")
-        failed = stdout.count(" failed")
-        errors = stdout.count(" error")
-        
-        result.data["tests_passed"] = passed > 0 and failed == 0 and errors == 0
-        result.data["summary"] = {
-            "passed": passed,
-            "failed": failed,
-            "errors": errors,
-        }
+    if result.data and "exit_code" in result.data:
+        # The exit code is authoritative (0 = everything passed); the
+        # counts come from pytest's one summary line, read from the tail
+        # of the output instead of substring-counting the whole buffer,
+        # which miscounted on 'error' appearing in tracebacks
+        counts = {"passed": 0, "failed": 0, "errors": 0, "skipped": 0}
+        tail = result.data.get("stdout", "")[-2048:]
+        for m in _PYTEST_SUMMARY_RE.finditer(tail):
+            word = m.group(2)
+            key = "errors" if word.startswith("error") else word
+            counts[key] = int(m.group(1))
+
+        result.data["tests_passed"] = result.data["exit_code"] == 0
+        result.data["summary"] = counts
     
     return result
 
 
+# Single-file check results keyed by (tool, path, mtime_ns, size). The
+# agent re-lints the same file between edits; when the stat identity is
+# unchanged the verdict is too, so the subprocess can be skipped. Capped,
+# oldest-first eviction like the other module caches.
+_CHECK_CACHE: dict[tuple[str, str, int, int], ToolResult] = {}
+_CHECK_CACHE_MAX = 1024
+
+
+async def _run_file_check(
+    tool: str,
+    cmd_parts: list[str],
+    repo_path: str,
+    file_path: str,
+    timeout: int,
+) -> ToolResult:
+    """Run a per-file check, reusing the cached result for unchanged files."""
+    full_path = file_path if os.path.isabs(file_path) else os.path.join(repo_path, file_path)
+    try:
+        st = os.stat(full_path)
+        key = (tool, full_path, st.st_mtime_ns, st.st_size)
+    except OSError:
+        key = None
+
+    if key is not None and (hit := _CHECK_CACHE.get(key)) is not None:
+        result = hit.model_copy(deep=True)
+        result.latency_ms = 0
+        if result.data is not None:
+            result.data["cached"] = True
+        return result
+
+    result = await run_command(cmd_parts, cwd=repo_path, timeout=timeout)
+    # Only verdicts are cacheable; timeouts and spawn failures are not
+    if key is not None and result.data and "exit_code" in result.data:
+        if len(_CHECK_CACHE) >= _CHECK_CACHE_MAX:
+            _CHECK_CACHE.pop(next(iter(_CHECK_CACHE)))
+        _CHECK_CACHE[key] = result.model_copy(deep=True)
+    return result
+
+
 async def run_linter(
     repo_path: str,
     file_path: str | None = None,
 ) -> ToolResult:
     """Run ruff linter on the repository.
-    
+
     Args:
         repo_path: Path to the repository
         file_path: Optional specific file to lint
-        
+
     Returns:
         ToolResult with lint results
     """
     cmd_parts = ["ruff", "check"]
-    
+
     if file_path:
         cmd_parts.append(file_path)
-    else:
-        cmd_parts.append(".")
-    
-    command = " ".join(cmd_parts)
-    
-    return await run_command(command, cwd=repo_path, timeout=60)
+        return await _run_file_check("ruff", cmd_parts, repo_path, file_path, timeout=60)
+
+    cmd_parts.append(".")
+    return await run_command(cmd_parts, cwd=repo_path, timeout=60)
 
 
 async def run_type_check(
@@ -206,21 +364,40 @@ async def run_type_check(
     file_path: str | None = None,
 ) -> ToolResult:
     """Run mypy type checker on the repository.
-    
+
     Args:
         repo_path: Path to the repository
         file_path: Optional specific file to check
-        
+
     Returns:
         ToolResult with type check results
     """
     cmd_parts = ["mypy"]
-    
+
     if file_path:
         cmd_parts.append(file_path)
-    else:
-        cmd_parts.append(".")
-    
-    command = " ".join(cmd_parts)
-    
-    return await run_command(command, cwd=repo_path, timeout=120)
+        return await _run_file_check("mypy", cmd_parts, repo_path, file_path, timeout=120)
+
+    cmd_parts.append(".")
+    return await run_command(cmd_parts, cwd=repo_path, timeout=120)
+
+
+async def run_all_checks(repo_path: str) -> dict[str, ToolResult]:
+    """Run lint, type check and tests concurrently.
+
+    The three checks are independent reads of the same working tree, so
+    running them under asyncio.gather costs the slowest check instead of
+    the sum of all three.
+
+    Args:
+        repo_path: Path to the repository
+
+    Returns:
+        Mapping of check name ("lint", "type_check", "tests") to its result
+    """
+    lint, type_check, tests = await asyncio.gather(
+        run_linter(repo_path),
+        run_type_check(repo_path),
+        run_tests(repo_path),
+    )
+    return {"lint": lint, "type_check": type_check, "tests": tests}